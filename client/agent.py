@@ -44,38 +44,52 @@ Example:
 """
 
 import sys
-from typing import List, Dict, Any, Generator
+from typing import List, Dict, Any, Generator, TYPE_CHECKING
 from dataclasses import dataclass
-from enum import Enum
+from enum import IntEnum
 
 # Import our modules
 from lib.config import get_config
-from lib.ui import print_step, print_info, print_success, print_llm_thought, print_error, Colors
-from lib.mcp_client import discover_all_tools
-from lib.llm_client import LLMClient
-from lib.tool_router import ToolRouter
+from lib.ui import (
+    print_step, print_info, print_success, print_llm_thought, print_error,
+    Colors, ConsoleBuffer
+)
 from lib.errors import (
     MCPError, LLMConnectionError, MCPServerError,
     ToolExecutionError, handle_error
 )
 
+# The MCP SDK and requests are slow to import, so the modules that use them
+# (mcp_client, llm_client, tool_router) are imported where they're needed.
+# Learning Point: deferred imports keep start-up fast for paths that never
+# reach them (e.g. the usage message), at the cost of hiding dependencies.
+if TYPE_CHECKING:
+    from lib.tool_router import ToolRouter
+
 
 # =============================================================================
 # Event Types for the MCPAgent Generator Interface
 # =============================================================================
 
-class EventType(Enum):
-    """Types of events yielded by MCPAgent.run()"""
-    STEP_START = "step_start"      # A step is beginning
-    INFO = "info"                   # Informational message
-    SUCCESS = "success"             # Something succeeded
-    TOOL_CALL = "tool_call"        # A tool is being called
-    TOOL_RESULT = "tool_result"    # A tool returned a result
-    FINAL_ANSWER = "final_answer"  # The final answer
-    ERROR = "error"                 # An error occurred
+class EventType(IntEnum):
+    """
+    Types of events yielded by MCPAgent.run()
+
+    Learning Point:
+        IntEnum members are plain ints, so comparing event types is an
+        integer comparison, and serialized events store a small number.
+    """
+    STEP_START = 1      # A step is beginning
+    INFO = 2            # Informational message
+    SUCCESS = 3         # Something succeeded
+    TOOL_CALL = 4       # A tool is being called
+    TOOL_RESULT = 5     # A tool returned a result
+    TOKEN = 6           # A streamed piece of the final answer
+    FINAL_ANSWER = 7    # The final answer
+    ERROR = 8           # An error occurred
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class AgentEvent:
     """
     Event yielded by MCPAgent during execution.
@@ -88,6 +102,11 @@ class AgentEvent:
         step: Which step of the agent loop (1-6, or 0 for errors)
         message: Human-readable description
         data: Optional additional data (tool calls, results, etc.)
+
+    Learning Point:
+        slots=True stores the fields in a fixed layout instead of a
+        per-instance __dict__ (less memory per event), and frozen=True
+        makes events read-only once yielded.
     """
     type: EventType
     step: int
@@ -120,12 +139,86 @@ class MCPAgent:
         operation to complete.
     """
 
+    # Most prompts remembered by _remember_prompt_tools
+    MAX_REMEMBERED_PROMPTS = 256
+
     def __init__(self):
         """Initialize the agent with configuration."""
         self.config = get_config()
+        from lib.llm_client import LLMClient
         self.llm_client = LLMClient()
         self.tools = []
         self.server_map = {}
+        self._tools_key = None
+        self._tools_complete = False
+        self._router = None
+        # Tools that answered each prompt before, in this agent. A repeated
+        # prompt only waits for the servers it needs.
+        self._prompt_tools: Dict[str, frozenset] = {}
+
+    def _discover_tools(self, prompt: str):
+        """
+        Discover tools, reusing the result of previous runs.
+
+        Tools rarely change while the agent is running, so discovery
+        only happens again if the configured server URLs change.
+
+        If the same prompt was answered before, discovery stops as soon as
+        the tools it used are found. Such a partial tool list is replaced
+        by a full discovery when a prompt needs more, or when it turns out
+        to be wrong for this prompt (see _forget_prompt_tools).
+        """
+        tools_key = (self.config.mcp_file_url, self.config.mcp_db_url)
+        required = self._prompt_tools.get(prompt)
+
+        if self.tools and self._tools_key == tools_key:
+            if self._tools_complete or (required and required <= self.server_map.keys()):
+                return
+
+        from lib.mcp_client import discover_all_tools
+        self.tools, self.server_map = discover_all_tools(required_tools=required)
+        self._tools_key = tools_key
+        self._tools_complete = required is None
+
+    def _remember_prompt_tools(self, prompt: str, tool_calls: List[Dict[str, Any]]):
+        """Remember which tools answered a prompt (see _discover_tools)."""
+        names = frozenset(tc.get("function", {}).get("name") for tc in tool_calls)
+        if not names <= self.server_map.keys():
+            return
+
+        prompt_tools = self._prompt_tools
+        if prompt not in prompt_tools and len(prompt_tools) >= self.MAX_REMEMBERED_PROMPTS:
+            # Forget the oldest prompt (dicts keep insertion order)
+            del prompt_tools[next(iter(prompt_tools))]
+        prompt_tools[prompt] = names
+
+    def _forget_prompt_tools(self, prompt: str) -> bool:
+        """
+        Stop offering a partial tool list for a prompt.
+
+        Returns:
+            True if the current tool list was partial, i.e. a new
+            discovery now loads every tool
+        """
+        self._prompt_tools.pop(prompt, None)
+        return not self._tools_complete
+
+    def _get_router(self) -> "ToolRouter":
+        """
+        Get the tool router, reusing it across runs.
+
+        Keeping one router alive lets its cache of read-only tool
+        results survive between questions. A new router is built
+        only when the discovered tools change.
+        """
+        if self._router is None or self._router.server_map != self.server_map:
+            from lib.tool_router import ToolRouter
+            if self._router is not None:
+                self._router.close()
+            self._router = ToolRouter(
+                dict(self.server_map), timeout=10, toon_tables=self.config.toon_results
+            )
+        return self._router
 
     def run(self, prompt: str) -> Generator[AgentEvent, None, None]:
         """
@@ -148,7 +241,7 @@ class MCPAgent:
             # =================================================================
             yield AgentEvent(EventType.STEP_START, 1, "Discovery & Assembly")
 
-            self.tools, self.server_map = discover_all_tools()
+            self._discover_tools(prompt)
 
             if not self.tools:
                 yield AgentEvent(EventType.ERROR, 1,
@@ -183,6 +276,21 @@ class MCPAgent:
 
             tool_calls, is_direct_answer = self.llm_client.parse_tool_calls(message)
 
+            unknown = [tc.get("function", {}).get("name") for tc in tool_calls or []
+                       if tc.get("function", {}).get("name") not in self.server_map]
+            if unknown and self._forget_prompt_tools(prompt):
+                # Only the tools this prompt used last time were loaded, and
+                # the model wants another one: load them all and ask again
+                yield AgentEvent(EventType.INFO, 3,
+                    f"Unknown tool(s) {', '.join(map(str, unknown))}, loading all tools")
+                self._discover_tools(prompt)
+                try:
+                    response_data = self.llm_client.chat(messages, self.tools)
+                except ConnectionError as e:
+                    raise LLMConnectionError(self.llm_client.ollama_url, str(e))
+                message = response_data.get("message", {})
+                tool_calls, is_direct_answer = self.llm_client.parse_tool_calls(message)
+
             if tool_calls:
                 yield AgentEvent(EventType.INFO, 3,
                     f"LLM decided to use {len(tool_calls)} tool(s)",
@@ -193,7 +301,7 @@ class MCPAgent:
                 # =============================================================
                 yield AgentEvent(EventType.STEP_START, 4, "Tool Execution")
 
-                router = ToolRouter(self.server_map, timeout=10)
+                router = self._get_router()
 
                 # Yield info about each tool call
                 for tc in tool_calls:
@@ -203,18 +311,29 @@ class MCPAgent:
                         f"Calling {tool_name}",
                         data={"name": tool_name, "arguments": tool_args})
 
+                yield AgentEvent(EventType.INFO, 4,
+                    f"Running {len(tool_calls)} tool(s)...")
+
+                # Tools run concurrently; yield each result as it arrives
+                # and keep them in request order for the LLM
+                results = [None] * len(tool_calls)
                 try:
-                    results = router.execute_tools(tool_calls)
+                    for index, result in router.iter_tool_results(tool_calls):
+                        results[index] = result
+                        tool_name = tool_calls[index].get("function", {}).get("name", "unknown")
+                        yield AgentEvent(EventType.TOOL_RESULT, 4,
+                            f"Got result from {tool_name}",
+                            data={"tool": tool_name, "result": result})
                 except ConnectionError as e:
                     raise MCPServerError("MCP Server", "unknown", str(e))
                 except Exception as e:
                     raise ToolExecutionError("unknown", str(e))
 
-                # Yield results
-                for result in results:
-                    yield AgentEvent(EventType.TOOL_RESULT, 4,
-                        f"Got result from {result.get('tool', 'unknown')}",
-                        data=result)
+                if not any("error" in result for result in results):
+                    self._remember_prompt_tools(prompt, tool_calls)
+                else:
+                    # The remembered tools may be why it failed
+                    self._forget_prompt_tools(prompt)
 
                 tool_result_messages = router.format_tool_results_for_llm(results)
 
@@ -229,12 +348,18 @@ class MCPAgent:
                     messages, message, tool_result_messages
                 )
 
+                # Stream the answer so the UI can show it while it's generated
+                parts = []
                 try:
-                    final_data = self.llm_client.chat(messages, self.tools)
+                    for chunk in self.llm_client.chat_stream(messages, self.tools):
+                        token = chunk.get("message", {}).get("content", "")
+                        if token:
+                            parts.append(token)
+                            yield AgentEvent(EventType.TOKEN, 5, token)
                 except ConnectionError as e:
                     raise LLMConnectionError(self.llm_client.ollama_url, str(e))
 
-                final_content = final_data["message"]["content"]
+                final_content = "".join(parts)
 
                 # =============================================================
                 # STEP 6: FINAL ANSWER
@@ -274,6 +399,10 @@ def chat(prompt: str):
         >>> chat("Who wrote the groceries note?")
         # Agent discovers tools, queries LLM, executes query_db, returns answer
     """
+    from lib.mcp_client import discover_all_tools
+    from lib.llm_client import LLMClient
+    from lib.tool_router import ToolRouter
+
     print(f"{Colors.BOLD}🤖 AGENT STARTING...{Colors.ENDC}")
     print(f'Goal: "{prompt}"\n')
 
@@ -330,16 +459,16 @@ def chat(prompt: str):
             # =============================================================
             print_step(4, "Tool Execution")
 
-            # Initialize tool router
-            router = ToolRouter(server_map, timeout=10)
-
-            # Execute all requested tools
-            try:
-                results = router.execute_tools(tool_calls)
-            except ConnectionError as e:
-                raise MCPServerError("MCP Server", "unknown", str(e))
-            except Exception as e:
-                raise ToolExecutionError("unknown", str(e))
+            # Initialize tool router. One question per run: its sessions
+            # are closed when the block ends
+            with ToolRouter(server_map, timeout=10, toon_tables=get_config().toon_results) as router:
+                # Execute all requested tools
+                try:
+                    results = router.execute_tools(tool_calls)
+                except ConnectionError as e:
+                    raise MCPServerError("MCP Server", "unknown", str(e))
+                except Exception as e:
+                    raise ToolExecutionError("unknown", str(e))
 
             # Format results for LLM
             tool_result_messages = router.format_tool_results_for_llm(results)
@@ -397,4 +526,6 @@ if __name__ == "__main__":
         sys.exit(1)
 
     prompt = sys.argv[1]
-    chat(prompt)
+    # Output is written once per step instead of once per line
+    with ConsoleBuffer():
+        chat(prompt)
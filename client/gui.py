@@ -15,8 +15,10 @@ Or via Docker:
 """
 
 import streamlit as st
-import json
+from dataclasses import replace
+from typing import Any
 from agent import MCPAgent, EventType, AgentEvent
+from lib import json_utils
 
 # =============================================================================
 # Page Configuration
@@ -76,81 +78,231 @@ st.markdown("""
 # Helper Functions (defined early so they can be used below)
 # =============================================================================
 
-STEP_NAMES = {
-    1: "Discovery",
-    2: "Reasoning",
-    3: "Decision",
-    4: "Execution",
-    5: "Synthesis",
-    6: "Answer"
+# Indexed by step number (0 is used for errors)
+STEP_NAMES = ("Unknown", "Discovery", "Reasoning", "Decision", "Execution", "Synthesis", "Answer")
+
+
+def step_name(step: int) -> str:
+    """Name of an agent loop step."""
+    return STEP_NAMES[step] if 0 <= step < len(STEP_NAMES) else "Unknown"
+
+
+# Longest tool result kept in the chat history
+HISTORY_RESULT_CHARS = 300
+
+# Longest pretty-printed tool arguments kept in the chat history
+HISTORY_ARGS_CHARS = 2000
+
+
+def truncate_result(result: Any) -> str:
+    """Shorten a tool result to what the history shows."""
+    if not isinstance(result, str):
+        result = str(result)
+    if len(result) > HISTORY_RESULT_CHARS:
+        result = result[:HISTORY_RESULT_CHARS] + "..."
+    return result
+
+
+def compact_for_history(event: AgentEvent) -> AgentEvent:
+    """
+    Drop what the history never shows before an event is stored.
+
+    Tool results can be huge (a whole file, a big query result); only the
+    truncated text is kept in session state. The live view still gets
+    the full result.
+
+    Learning Point:
+        The result is turned into a string here, once, when the event is
+        written. Rendering the history later does no conversion at all.
+    """
+    if event.type == EventType.TOOL_RESULT and event.data:
+        result = truncate_result(event.data.get("result", ""))
+        return replace(event, data={**event.data, "result": result})
+    return event
+
+
+# -----------------------------------------------------------------------------
+# History rendering: one small function per event type, picked from a table
+# -----------------------------------------------------------------------------
+
+def _ops_step_start(event: AgentEvent) -> list:
+    return [("markdown", f"**Step {event.step}: {step_name(event.step)}** - {event.message}")]
+
+
+def _ops_info(event: AgentEvent) -> list:
+    return [("markdown", f"  ℹ️ {event.message}")]
+
+
+def _ops_success(event: AgentEvent) -> list:
+    return [("markdown", f"  ✅ {event.message}")]
+
+
+def _ops_tool_call(event: AgentEvent) -> list:
+    if not event.data:
+        return [("markdown", f"  🛠️ {event.message}")]
+    tool_name = event.data.get("name", "unknown")
+    args = event.data.get("arguments", {})
+    ops = [("markdown", f"  🛠️ **{tool_name}**")]
+    if args:
+        # Pretty-printed once, when the event is stored; capped so a huge
+        # argument (e.g. a whole document) doesn't bloat the history
+        args_json = json_utils.dumps_pretty(args)
+        if len(args_json) > HISTORY_ARGS_CHARS:
+            args_json = args_json[:HISTORY_ARGS_CHARS] + "\n..."
+        ops.append(("json", args_json))
+    return ops
+
+
+def _ops_tool_result(event: AgentEvent) -> list:
+    if not event.data:
+        return [("markdown", f"  📤 {event.message}")]
+    tool_name = event.data.get("tool", "unknown")
+    # compact_for_history already made this a short string
+    result = event.data.get("result", "")
+    if not isinstance(result, str):
+        result = truncate_result(result)
+    return [("markdown", f"  📤 Result from **{tool_name}**:"), ("code", result)]
+
+
+def _ops_error(event: AgentEvent) -> list:
+    return [("error", f"❌ {event.message}")]
+
+
+_HISTORY_OPS = {
+    EventType.STEP_START: _ops_step_start,
+    EventType.INFO: _ops_info,
+    EventType.SUCCESS: _ops_success,
+    EventType.TOOL_CALL: _ops_tool_call,
+    EventType.TOOL_RESULT: _ops_tool_result,
+    EventType.ERROR: _ops_error,
+}
+
+# How each kind of rendered op is written to the page
+_OP_WRITERS = {
+    "markdown": st.markdown,
+    "json": lambda text: st.code(text, language="json"),
+    "code": st.code,
+    "error": st.error,
 }
 
 
-def serialize_event(event: AgentEvent) -> dict:
-    """Convert an AgentEvent to a serializable dict for session state."""
-    return {
-        "type": event.type.value,
-        "step": event.step,
-        "message": event.message,
-        "data": event.data
-    }
+def render_ops(event: AgentEvent) -> list:
+    """
+    Work out how an event is shown in the chat history.
+
+    Returns a list of (kind, text) pairs, where kind is a key of
+    _OP_WRITERS. Computed once when the event is stored, so reruns
+    just replay it.
+
+    Learning Point:
+        A dict from event type to function replaces a long if/elif
+        chain: one lookup instead of a comparison per branch, and each
+        event type's rendering lives in its own small function.
+    """
+    ops_for = _HISTORY_OPS.get(event.type)
+    return ops_for(event) if ops_for else []
+
+
+# -----------------------------------------------------------------------------
+# Live rendering: the one-line progress shown while the agent works
+# -----------------------------------------------------------------------------
+
+def _tool_name(event: AgentEvent, key: str) -> str:
+    return event.data.get(key, "unknown") if event.data else "unknown"
+
+
+_LIVE_LINES = {
+    EventType.STEP_START: lambda event: f"**Step {event.step}: {step_name(event.step)}**",
+    EventType.INFO: lambda event: f"  ℹ️ {event.message}",
+    EventType.SUCCESS: lambda event: f"  ✅ {event.message}",
+    EventType.TOOL_CALL: lambda event: f"  🛠️ Calling: `{_tool_name(event, 'name')}`",
+    EventType.TOOL_RESULT: lambda event: f"  📤 Got result from `{_tool_name(event, 'tool')}`",
+}
+
+# Live lines are written in batches (one Streamlit element per batch).
+# These event types flush the batch at once: they come right before the
+# agent waits (on the LLM or on tools) or right after a wait, so holding
+# them back would hide progress. SUCCESS and TOOL_CALL lines are always
+# followed immediately by another event and just join the next batch.
+_FLUSH_AFTER = {EventType.STEP_START, EventType.INFO, EventType.TOOL_RESULT}
+LIVE_BATCH_SIZE = 8
+
+
+def serialize_events(events: list) -> list:
+    """
+    Convert a run's AgentEvents to serializable dicts for session state.
+
+    All events are converted in one comprehension rather than one
+    function call per event.
+    """
+    return [
+        {
+            "type": event.type.value,
+            "step": event.step,
+            "message": event.message,
+            "data": event.data,
+            "rendered": render_ops(event)
+        }
+        for event in events
+    ]
+
+
+# Event type for each serialized value: one dict lookup instead of EventType(...)
+_ETYPE_BY_VALUE = {event_type.value: event_type for event_type in EventType}
 
 
 def deserialize_event(data: dict) -> AgentEvent:
     """Convert a dict back to an AgentEvent."""
     return AgentEvent(
-        type=EventType(data["type"]),
-        step=data["step"],
-        message=data["message"],
-        data=data.get("data")
+        _ETYPE_BY_VALUE[data["type"]],
+        data["step"],
+        data["message"],
+        data.get("data")
     )
 
 
 def render_history_event(event_data: dict):
     """Render a serialized event from chat history."""
-    event = deserialize_event(event_data)
-
-    if event.type == EventType.STEP_START:
-        step_name = STEP_NAMES.get(event.step, "Unknown")
-        st.markdown(f"**Step {event.step}: {step_name}** - {event.message}")
-
-    elif event.type == EventType.INFO:
-        st.write(f"  ℹ️ {event.message}")
-
-    elif event.type == EventType.SUCCESS:
-        st.write(f"  ✅ {event.message}")
-
-    elif event.type == EventType.TOOL_CALL:
-        if event.data:
-            tool_name = event.data.get("name", "unknown")
-            args = event.data.get("arguments", {})
-            st.write(f"  🛠️ **{tool_name}**")
-            if args:
-                st.code(json.dumps(args, indent=2), language="json")
-        else:
-            st.write(f"  🛠️ {event.message}")
-
-    elif event.type == EventType.TOOL_RESULT:
-        if event.data:
-            tool_name = event.data.get("tool", "unknown")
-            result = str(event.data.get("result", ""))
-            # Truncate long results
-            if len(result) > 300:
-                result = result[:300] + "..."
-            st.write(f"  📤 Result from **{tool_name}**:")
-            st.code(result)
-        else:
-            st.write(f"  📤 {event.message}")
-
-    elif event.type == EventType.ERROR:
-        st.error(f"❌ {event.message}")
+    ops = event_data.get("rendered")
+    if ops is None:
+        ops = render_ops(deserialize_event(event_data))
+
+    for kind, text in ops:
+        _OP_WRITERS[kind](text)
 
 
 # =============================================================================
 # Sidebar
 # =============================================================================
 
-with st.sidebar:
+# The agent loop explanation never changes: build it once at import
+AGENT_LOOP_MD = """
+**1. Discovery** 🔍
+Find available tools
+
+**2. Reasoning** 🧠
+Send prompt to LLM
+
+**3. Decision** 🎯
+LLM chooses tools
+
+**4. Execution** ⚙️
+Run the tools
+
+**5. Synthesis** 📝
+Generate final answer
+"""
+
+
+@st.fragment
+def sidebar() -> None:
+    """
+    Draw the sidebar.
+
+    Learning Point:
+        As a fragment, the sidebar is not redrawn while the chat fragment
+        streams an answer. Only the Clear button asks for a full rerun.
+    """
     st.title("🧪 MCP Lab")
     st.caption("Educational AI Agent Playground")
 
@@ -159,32 +311,24 @@ with st.sidebar:
     # Clear conversation button
     if st.button("🗑️ Clear Conversation", use_container_width=True):
         st.session_state.messages = []
+        # Also drop the agent, so cached tool results are refreshed
+        st.session_state.pop("agent", None)
         st.rerun()
 
     st.divider()
 
     # Agent loop explanation
     st.subheader("The Agent Loop")
-    st.markdown("""
-    **1. Discovery** 🔍
-    Find available tools
-
-    **2. Reasoning** 🧠
-    Send prompt to LLM
+    st.markdown(AGENT_LOOP_MD)
 
-    **3. Decision** 🎯
-    LLM chooses tools
+    st.divider()
 
-    **4. Execution** ⚙️
-    Run the tools
+    st.caption("Built for learning MCP and AI Agents")
 
-    **5. Synthesis** 📝
-    Generate final answer
-    """)
 
-    st.divider()
+with st.sidebar:
+    sidebar()
 
-    st.caption("Built for learning MCP and AI Agents")
 
 # =============================================================================
 # Main Chat Interface
@@ -197,22 +341,40 @@ st.caption("Ask questions about files or the database")
 if "messages" not in st.session_state:
     st.session_state.messages = []
 
-# Display chat history
-for message in st.session_state.messages:
-    with st.chat_message(message["role"]):
-        st.markdown(message["content"])
+# Keep one agent per browser session so its caches survive between questions
+if "agent" not in st.session_state:
+    st.session_state.agent = MCPAgent()
+
+def render_history():
+    """Show every message of the conversation so far."""
+    for message in st.session_state.messages:
+        with st.chat_message(message["role"]):
+            st.markdown(message["content"])
+
+            # Show agent loop details in an expander for assistant messages
+            if message["role"] == "assistant" and message.get("events_blob"):
+                with st.expander("🔍 View Agent Loop Details", expanded=False):
+                    for event_data in json_utils.loads(message["events_blob"]):
+                        render_history_event(event_data)
 
-        # Show agent loop details in an expander for assistant messages
-        if message["role"] == "assistant" and "events" in message and message["events"]:
-            with st.expander("🔍 View Agent Loop Details", expanded=False):
-                for event_data in message["events"]:
-                    render_history_event(event_data)
 
 # =============================================================================
 # Chat Input Handler
 # =============================================================================
 
-if prompt := st.chat_input("Ask me something... (e.g., 'Who wrote the groceries note?')"):
+def handle_prompt(prompt: str, batch_size: int = LIVE_BATCH_SIZE):
+    """
+    Run the agent on a prompt, showing its progress live.
+
+    Args:
+        prompt: The user's question
+        batch_size: Most progress lines written as one element
+
+    Learning Point:
+        Every st.* call sends a message to the browser. Joining progress
+        lines that arrive back-to-back into one st.markdown() call sends
+        fewer, larger updates without delaying anything visible.
+    """
     # Add user message to history
     st.session_state.messages.append({"role": "user", "content": prompt})
 
@@ -222,49 +384,85 @@ if prompt := st.chat_input("Ask me something... (e.g., 'Who wrote the groceries
 
     # Run the agent and display response
     with st.chat_message("assistant"):
-        agent = MCPAgent()
+        agent = st.session_state.agent
         events = []
         final_answer = ""
 
-        # Show progress
-        with st.status("🤖 Agent is working...", expanded=True) as status:
+        # Show progress, with the answer streamed into a placeholder below it
+        status = st.status("🤖 Agent is working...", expanded=True)
+        answer_placeholder = st.empty()
+        streamed_text = ""
+        pending_lines = []
+
+        def flush_lines():
+            if pending_lines:
+                st.markdown("\n\n".join(pending_lines))
+                pending_lines.clear()
+
+        with status:
             for event in agent.run(prompt):
-                events.append(event)
+                # Look the type up once; the checks below compare this local
+                etype = event.type
 
-                if event.type == EventType.STEP_START:
-                    step_name = STEP_NAMES.get(event.step, "Unknown")
-                    st.write(f"**Step {event.step}: {step_name}**")
+                if etype is EventType.TOKEN:
+                    flush_lines()
+                    # Tokens are rendered live but not kept in the history
+                    streamed_text += event.message
+                    answer_placeholder.markdown(streamed_text + "▌")
+                    continue
 
-                elif event.type == EventType.INFO:
-                    st.write(f"  ℹ️ {event.message}")
+                events.append(compact_for_history(event))
 
-                elif event.type == EventType.SUCCESS:
-                    st.write(f"  ✅ {event.message}")
+                live_line = _LIVE_LINES.get(etype)
+                if live_line is not None:
+                    pending_lines.append(live_line(event))
+                    if etype in _FLUSH_AFTER or len(pending_lines) >= batch_size:
+                        flush_lines()
+                    continue
 
-                elif event.type == EventType.TOOL_CALL:
-                    tool_name = event.data.get("name", "unknown") if event.data else "unknown"
-                    st.write(f"  🛠️ Calling: `{tool_name}`")
+                flush_lines()
 
-                elif event.type == EventType.TOOL_RESULT:
-                    tool_name = event.data.get("tool", "unknown") if event.data else "unknown"
-                    st.write(f"  📤 Got result from `{tool_name}`")
+                match etype:
+                    case EventType.FINAL_ANSWER:
+                        final_answer = event.message
+                        status.update(label="✨ Complete!", state="complete", expanded=False)
 
-                elif event.type == EventType.FINAL_ANSWER:
-                    final_answer = event.message
-                    status.update(label="✨ Complete!", state="complete", expanded=False)
+                    case EventType.ERROR:
+                        st.error(event.message)
+                        status.update(label="❌ Error", state="error")
+                        final_answer = f"Error: {event.message}"
 
-                elif event.type == EventType.ERROR:
-                    st.error(event.message)
-                    status.update(label="❌ Error", state="error")
-                    final_answer = f"Error: {event.message}"
+            flush_lines()
 
         # Display the final answer
         if final_answer:
-            st.markdown(final_answer)
+            answer_placeholder.markdown(final_answer)
 
         # Store in session state
+        # Learning Point: the events are kept as one JSON bytes blob rather
+        # than a list of nested dicts - one object per message instead of
+        # dozens, which is cheaper to keep around and to copy or pickle.
         st.session_state.messages.append({
             "role": "assistant",
             "content": final_answer,
-            "events": [serialize_event(e) for e in events]
+            "events_blob": json_utils.dumps_bytes(serialize_events(events), default=str)
         })
+
+
+@st.fragment
+def chat_interface():
+    """
+    The conversation and its input box.
+
+    Learning Point:
+        Streamlit re-runs the whole script on every interaction. As a
+        fragment, sending a message only re-runs this function: the page
+        header, styles and sidebar are not rebuilt each time.
+    """
+    render_history()
+
+    if prompt := st.chat_input("Ask me something... (e.g., 'Who wrote the groceries note?')"):
+        handle_prompt(prompt)
+
+
+chat_interface()
@@ -30,7 +30,8 @@ Example:
 """
 
 import os
-from typing import Dict
+from functools import cached_property, lru_cache
+from typing import Dict, Optional
 
 
 class AppConfig:
@@ -43,8 +44,14 @@ class AppConfig:
     Attributes:
         ollama_url: URL of the Ollama server (the LLM "brain")
         model_name: Name of the model to use (e.g., llama3.2:3b)
+        ollama_keep_alive: How long Ollama keeps the model loaded after a request
         mcp_file_url: URL of the file MCP server
         mcp_db_url: URL of the database MCP server
+        tools_cache_dir: Directory for cached tool schemas
+        tools_cache_ttl: Seconds cached tool schemas stay valid (0 disables)
+        max_tools: Most tools discovered per server (0 = no limit)
+        toon_results: Whether tabular tool results are sent as TOON
+        llm_cache_ttl: Seconds a cached LLM answer stays valid (0 = no cache)
         server_map: Mapping of tool names to their server URLs
 
     Learning Point:
@@ -56,30 +63,85 @@ class AppConfig:
         """
         Initialize configuration from environment variables.
 
-        Loads all required settings and provides defaults for common cases.
-        Validates that critical settings are present.
+        Each setting is read from the environment the first time it is
+        used (see the properties below), then remembered.
 
-        Raises:
-            ValueError: If required configuration is missing
+        Learning Point:
+            functools.cached_property runs the getter once and stores the
+            result on the instance, so later reads are plain attribute
+            lookups - lazy loading without any bookkeeping code.
         """
-        # Ollama Configuration
-        # The "brain" that powers the agent - where the LLM runs
-        self.ollama_url = os.environ.get("OLLAMA_URL", "https://myollama.my.address.it")
-
-        # Model selection - smaller models are faster but less capable
-        # llama3.2:3b is a good balance for learning (2GB RAM, fast responses)
-        self.model_name = os.environ.get("MODEL_NAME", "llama3")
-
-        # MCP Server URLs
-        # These are the "tools" that the agent can use
-        # Default to Docker Compose service names for containerized setup
-        self.mcp_file_url = os.environ.get("MCP_FILE_URL", "http://mcp-file:3333")
-        self.mcp_db_url = os.environ.get("MCP_DB_URL", "http://mcp-db:3334")
-
-        # Server Map: Tool Name → Server URL
-        # This tells the agent which server to call for each tool
-        # In a dynamic system, this might be discovered automatically
-        self.server_map: Dict[str, str] = {
+        # Built on first use by summary()
+        self._summary: Optional[str] = None
+
+    # Ollama Configuration
+    # The "brain" that powers the agent - where the LLM runs
+    @cached_property
+    def ollama_url(self) -> str:
+        return os.environ.get("OLLAMA_URL", "https://myollama.my.address.it")
+
+    # Model selection - smaller models are faster but less capable
+    # llama3.2:3b is a good balance for learning (2GB RAM, fast responses)
+    @cached_property
+    def model_name(self) -> str:
+        return os.environ.get("MODEL_NAME", "llama3")
+
+    # How long Ollama keeps the model (and its prompt cache) in memory
+    # between requests. Ollama's own default is 5m; a longer value avoids
+    # reloading the model between questions. Accepts "30m", "1h", "-1"...
+    @cached_property
+    def ollama_keep_alive(self) -> str:
+        return os.environ.get("OLLAMA_KEEP_ALIVE", "30m")
+
+    # MCP Server URLs
+    # These are the "tools" that the agent can use
+    # Default to Docker Compose service names for containerized setup
+    @cached_property
+    def mcp_file_url(self) -> str:
+        return os.environ.get("MCP_FILE_URL", "http://mcp-file:3333")
+
+    @cached_property
+    def mcp_db_url(self) -> str:
+        return os.environ.get("MCP_DB_URL", "http://mcp-db:3334")
+
+    # Tool schemas are cached on disk between runs (see MCPClient.get_tools).
+    # Follows the XDG convention: $XDG_CACHE_HOME/mcp-lab, else ~/.cache/mcp-lab
+    @cached_property
+    def tools_cache_dir(self) -> str:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+        return os.environ.get("MCP_TOOLS_CACHE_DIR", os.path.join(base, "mcp-lab"))
+
+    # Schemas rarely change; a day is a safe default. 0 turns the cache off.
+    @cached_property
+    def tools_cache_ttl(self) -> float:
+        return float(os.environ.get("MCP_TOOLS_CACHE_TTL", "86400"))
+
+    # Most tools kept from one server (0 = no limit). Every schema is sent
+    # with each LLM request, so huge tool lists cost context and accuracy
+    @cached_property
+    def max_tools(self) -> int:
+        return int(os.environ.get("MCP_MAX_TOOLS", "40"))
+
+    # Send tabular tool results (e.g. SELECT rows) to the LLM as compact
+    # TOON tables instead of JSON. Off by default: small models may read
+    # JSON more reliably
+    @cached_property
+    def toon_results(self) -> bool:
+        return os.environ.get("MCP_TOON_RESULTS", "0") == "1"
+
+    # Reuse the LLM's answer to an identical request for this many seconds.
+    # Off by default: a cached answer can be out of date, and conversations
+    # that include tool results are never cached (see LLMClient.chat)
+    @cached_property
+    def llm_cache_ttl(self) -> float:
+        return float(os.environ.get("MCP_LLM_CACHE_TTL", "0"))
+
+    # Server Map: Tool Name → Server URL
+    # This tells the agent which server to call for each tool
+    # In a dynamic system, this might be discovered automatically
+    @cached_property
+    def server_map(self) -> Dict[str, str]:
+        return {
             "read_file": self.mcp_file_url,
             "query_db": self.mcp_db_url
         }
@@ -130,22 +192,21 @@ class AppConfig:
         Learning Point:
             Configuration summaries are helpful for debugging and logging.
             Users can quickly see what settings are active.
+            Settings don't change after start-up, so the text is built once.
         """
-        return (
-            "MCP Agent Configuration:\n"
-            f"  Ollama URL: {self.ollama_url}\n"
-            f"  Model: {self.model_name}\n"
-            f"  File Server: {self.mcp_file_url}\n"
-            f"  DB Server: {self.mcp_db_url}\n"
-            f"  Tools: {len(self.server_map)} registered"
-        )
-
-
-# Singleton instance
-# This ensures we only load configuration once
-_config_instance = None
+        if self._summary is None:
+            self._summary = (
+                "MCP Agent Configuration:\n"
+                f"  Ollama URL: {self.ollama_url}\n"
+                f"  Model: {self.model_name}\n"
+                f"  File Server: {self.mcp_file_url}\n"
+                f"  DB Server: {self.mcp_db_url}\n"
+                f"  Tools: {len(self.server_map)} registered"
+            )
+        return self._summary
 
 
+@lru_cache(maxsize=1)
 def get_config() -> AppConfig:
     """
     Get the application configuration (singleton pattern).
@@ -161,17 +222,17 @@ def get_config() -> AppConfig:
         This is useful for configuration, database connections, and other
         resources that should be shared across the application.
 
+        lru_cache(maxsize=1) remembers the one instance for us - no global
+        variable to check, and no half-built instance visible to another
+        thread (e.g. concurrent Streamlit sessions).
+
     Example:
         config = get_config()
         print(config.ollama_url)
     """
-    global _config_instance
-
-    if _config_instance is None:
-        _config_instance = AppConfig()
-        _config_instance.validate()
-
-    return _config_instance
+    config = AppConfig()
+    config.validate()
+    return config
 
 
 def reset_config():
@@ -185,5 +246,4 @@ def reset_config():
         Testability is important. Even singletons should have a way to
         reset for testing purposes.
     """
-    global _config_instance
-    _config_instance = None
+    get_config.cache_clear()
@@ -59,6 +59,8 @@ Real-World Example:
              📖 Learn more: README.md section 'Ollama Configuration'"
 """
 
+from functools import lru_cache
+
 
 class MCPError(Exception):
     """
@@ -83,32 +85,23 @@ class MCPError(Exception):
     pass
 
 
-class ConfigurationError(MCPError):
-    """
-    Raised when configuration is invalid or incomplete.
-
-    This error appears early (during startup) when the system detects
-    missing or invalid configuration.
+# =============================================================================
+# Message Templates
+# =============================================================================
+# The long help texts are module-level templates with {placeholders},
+# filled in with str.format_map() when an error is raised.
+#
+# Learning Point:
+#   Keeping the text apart from the code makes both easier to read, and
+#   the template is built once at import instead of being re-assembled
+#   from f-string pieces on every raise.
 
-    Learning Point:
-        Validating configuration at startup (fail fast) is better than
-        failing deep in the application with a confusing error.
-    """
-
-    def __init__(self, missing_var: str, current_value: str = None):
-        """
-        Create a configuration error with helpful guidance.
-
-        Args:
-            missing_var: Name of the missing/invalid configuration variable
-            current_value: Current value (if any) that's invalid
-        """
-        message = f"Configuration Error: {missing_var} is not set correctly"
-
-        if current_value:
-            message += f"\nCurrent value: {current_value}"
+_DETAILS = """
+🔍 Technical details:
+   {details}
+"""
 
-        message += f"""
+_CONFIG_ERROR = """Configuration Error: {missing_var} is not set correctly{current_value}
 
 📚 What does this mean?
    The agent needs configuration to know where to find services.
@@ -127,28 +120,8 @@ class ConfigurationError(MCPError):
 
 📖 Learn more: README.md section 'Configuration Guide'
 """
-        super().__init__(message)
 
-
-class LLMConnectionError(MCPError):
-    """
-    Raised when cannot connect to Ollama (the LLM).
-
-    This is one of the most common errors for new users, so we provide
-    extensive troubleshooting guidance.
-    """
-
-    def __init__(self, url: str, details: str = ""):
-        """
-        Create an LLM connection error with troubleshooting steps.
-
-        Args:
-            url: The Ollama URL that failed to connect
-            details: Optional technical details about the error
-        """
-        message = f"Cannot connect to Ollama at {url}"
-
-        message += """
+_LLM_CONNECTION_ERROR = """Cannot connect to Ollama at {url}
 
 📚 What is Ollama?
    Ollama is the 'brain' - the LLM (Large Language Model) that powers
@@ -172,40 +145,11 @@ class LLMConnectionError(MCPError):
    Check if Ollama is running:
      → docker compose ps  (for containerized)
      → curl http://localhost:11434/api/version  (for local)
-"""
-
-        if details:
-            message += f"""
-🔍 Technical details:
-   {details}
-"""
-
-        message += """
+{details}
 📖 Learn more: README.md section 'Troubleshooting'
 """
-        super().__init__(message)
-
-
-class MCPServerError(MCPError):
-    """
-    Raised when an MCP server (tool server) has problems.
 
-    MCP servers provide the "tools" (file access, database, etc.).
-    If they're down, the agent can't perform actions.
-    """
-
-    def __init__(self, server_name: str, server_url: str, details: str = ""):
-        """
-        Create an MCP server error with troubleshooting.
-
-        Args:
-            server_name: Friendly name (e.g., "File Server")
-            server_url: URL that failed
-            details: Optional technical details
-        """
-        message = f"Cannot connect to {server_name} at {server_url}"
-
-        message += f"""
+_MCP_SERVER_ERROR = """Cannot connect to {server_name} at {server_url}
 
 📚 What does this mean?
    MCP servers provide "tools" that the agent uses to take actions.
@@ -224,65 +168,35 @@ class MCPServerError(MCPError):
       → make up
 
    4. Check server logs for errors:
-      → docker compose logs {server_name.lower().replace(' ', '-')}
+      → docker compose logs {service}
 
    5. Verify network connectivity:
-      → docker compose exec mcp-agent ping {server_name.lower().replace(' ', '-')}
-"""
-
-        if details:
-            message += f"""
-🔍 Technical details:
-   {details}
-"""
-
-        message += """
+      → docker compose exec mcp-agent ping {service}
+{details}
 📖 Learn more: README.md section 'Troubleshooting'
 """
-        super().__init__(message)
-
-
-class ToolExecutionError(MCPError):
-    """
-    Raised when a tool fails to execute properly.
-
-    Tools can fail for many reasons: invalid arguments, permission issues,
-    resource not found, etc. This error provides context about what went wrong.
-    """
-
-    def __init__(self, tool_name: str, reason: str, arguments: dict = None):
-        """
-        Create a tool execution error.
-
-        Args:
-            tool_name: Name of the tool that failed
-            reason: Why it failed
-            arguments: Arguments that were passed (optional)
-        """
-        message = f"Tool '{tool_name}' failed to execute"
 
-        message += f"""
+_TOOL_EXECUTION_ERROR = """Tool '{tool_name}' failed to execute
 
 📚 What happened?
    The agent tried to use the '{tool_name}' tool, but it failed:
    {reason}
+{arguments}
+🔧 How to fix:
+
+   Common issues with {tool_name}:
+{guidance}
+📖 Learn more: README.md section 'Adding Tools'
 """
 
-        if arguments:
-            message += f"""
+_TOOL_ARGUMENTS = """
    Arguments provided:
    {arguments}
 """
 
-        message += f"""
-🔧 How to fix:
-
-   Common issues with {tool_name}:
-"""
-
-        # Tool-specific guidance
-        if tool_name == "read_file":
-            message += """
+# Tool-specific guidance for ToolExecutionError
+_TOOL_GUIDANCE = {
+    "read_file": """
       • File doesn't exist: Check the file path
         → ls mcp-file/data/
 
@@ -292,10 +206,8 @@ class ToolExecutionError(MCPError):
 
       • File too large: Current limit is 10MB
         → Check file size: ls -lh mcp-file/data/
-"""
-
-        elif tool_name == "query_db":
-            message += """
+""",
+    "query_db": """
       • SQL syntax error: Check your query syntax
         → PostgreSQL docs: https://www.postgresql.org/docs/
 
@@ -308,38 +220,16 @@ class ToolExecutionError(MCPError):
 
       • Permission denied: Query might be blocked by security rules
         → Check if using DROP, DELETE, or ALTER
-"""
+""",
+}
 
-        else:
-            message += f"""
+_GENERIC_TOOL_GUIDANCE = """
       • Check that the tool server is running: docker compose ps
       • Check server logs: docker compose logs
       • Verify arguments match the tool's schema
 """
 
-        message += """
-📖 Learn more: README.md section 'Adding Tools'
-"""
-        super().__init__(message)
-
-
-class ModelNotFoundError(MCPError):
-    """
-    Raised when the specified model doesn't exist in Ollama.
-
-    Users might configure a model name that hasn't been downloaded yet.
-    """
-
-    def __init__(self, model_name: str):
-        """
-        Create a model not found error.
-
-        Args:
-            model_name: Name of the model that wasn't found
-        """
-        message = f"Model '{model_name}' not found in Ollama"
-
-        message += f"""
+_MODEL_NOT_FOUND_ERROR = """Model '{model_name}' not found in Ollama
 
 📚 What does this mean?
    Ollama needs to download models before they can be used.
@@ -365,7 +255,126 @@ class ModelNotFoundError(MCPError):
 
 📖 Learn more: README.md section 'Model Selection'
 """
-        super().__init__(message)
+
+
+def _details(details: str) -> str:
+    """Optional technical-details block shared by the connection errors."""
+    return _DETAILS.format_map({"details": details}) if details else ""
+
+
+class ConfigurationError(MCPError):
+    """
+    Raised when configuration is invalid or incomplete.
+
+    This error appears early (during startup) when the system detects
+    missing or invalid configuration.
+
+    Learning Point:
+        Validating configuration at startup (fail fast) is better than
+        failing deep in the application with a confusing error.
+    """
+
+    def __init__(self, missing_var: str, current_value: str = None):
+        """
+        Create a configuration error with helpful guidance.
+
+        Args:
+            missing_var: Name of the missing/invalid configuration variable
+            current_value: Current value (if any) that's invalid
+        """
+        super().__init__(_CONFIG_ERROR.format_map({
+            "missing_var": missing_var,
+            "current_value": f"\nCurrent value: {current_value}" if current_value else "",
+        }))
+
+
+class LLMConnectionError(MCPError):
+    """
+    Raised when cannot connect to Ollama (the LLM).
+
+    This is one of the most common errors for new users, so we provide
+    extensive troubleshooting guidance.
+    """
+
+    def __init__(self, url: str, details: str = ""):
+        """
+        Create an LLM connection error with troubleshooting steps.
+
+        Args:
+            url: The Ollama URL that failed to connect
+            details: Optional technical details about the error
+        """
+        super().__init__(_LLM_CONNECTION_ERROR.format_map({
+            "url": url,
+            "details": _details(details),
+        }))
+
+
+class MCPServerError(MCPError):
+    """
+    Raised when an MCP server (tool server) has problems.
+
+    MCP servers provide the "tools" (file access, database, etc.).
+    If they're down, the agent can't perform actions.
+    """
+
+    def __init__(self, server_name: str, server_url: str, details: str = ""):
+        """
+        Create an MCP server error with troubleshooting.
+
+        Args:
+            server_name: Friendly name (e.g., "File Server")
+            server_url: URL that failed
+            details: Optional technical details
+        """
+        super().__init__(_MCP_SERVER_ERROR.format_map({
+            "server_name": server_name,
+            "server_url": server_url,
+            "service": server_name.lower().replace(' ', '-'),
+            "details": _details(details),
+        }))
+
+
+class ToolExecutionError(MCPError):
+    """
+    Raised when a tool fails to execute properly.
+
+    Tools can fail for many reasons: invalid arguments, permission issues,
+    resource not found, etc. This error provides context about what went wrong.
+    """
+
+    def __init__(self, tool_name: str, reason: str, arguments: dict = None):
+        """
+        Create a tool execution error.
+
+        Args:
+            tool_name: Name of the tool that failed
+            reason: Why it failed
+            arguments: Arguments that were passed (optional)
+        """
+        super().__init__(_TOOL_EXECUTION_ERROR.format_map({
+            "tool_name": tool_name,
+            "reason": reason,
+            "arguments": _TOOL_ARGUMENTS.format_map({"arguments": arguments}) if arguments else "",
+            "guidance": _TOOL_GUIDANCE.get(tool_name, _GENERIC_TOOL_GUIDANCE),
+        }))
+
+
+class ModelNotFoundError(MCPError):
+    """
+    Raised when the specified model doesn't exist in Ollama.
+
+    Users might configure a model name that hasn't been downloaded yet.
+    """
+
+    def __init__(self, model_name: str):
+        """
+        Create a model not found error.
+
+        Args:
+            model_name: Name of the model that wasn't found
+        """
+        super().__init__(_MODEL_NOT_FOUND_ERROR.format_map({"model_name": model_name}))
 
 
 def handle_error(error: Exception) -> str:
@@ -397,11 +406,24 @@ def handle_error(error: Exception) -> str:
         return str(error)
 
     # Otherwise, wrap it in a generic but helpful message
+    return _format_unexpected_error(type(error).__name__, str(error))
+
+
+@lru_cache(maxsize=128)
+def _format_unexpected_error(error_type: str, error_message: str) -> str:
+    """
+    Build the generic error message for an unexpected exception.
+
+    Learning Point:
+        The message depends only on the exception's type and text, so it
+        is memoized: a retry loop hitting the same error over and over
+        formats it once.
+    """
     return f"""
-Unexpected Error: {type(error).__name__}
+Unexpected Error: {error_type}
 
 📚 What happened?
-   An unexpected error occurred: {str(error)}
+   An unexpected error occurred: {error_message}
 
 🔧 What to try:
 
@@ -423,11 +445,11 @@ Unexpected Error: {type(error).__name__}
       → Include this error message and steps to reproduce
 
 🔍 Technical details:
-   Error type: {type(error).__name__}
-   Error message: {str(error)}
+   Error type: {error_type}
+   Error message: {error_message}
 
    Stack trace (for debugging):
-   {error}
+   {error_message}
 
 📖 Learn more: README.md section 'Troubleshooting'
 """
@@ -0,0 +1,120 @@
+"""
+JSON Utilities - Fast Encoding and Decoding
+===========================================
+
+This module wraps JSON encoding/decoding so the rest of the client
+doesn't care which JSON library is installed.
+
+Why this exists:
+- Every LLM round-trip encodes the whole conversation + tool schemas
+  and decodes a response that may be several KB
+- `orjson` (written in Rust) is several times faster than the standard
+  library `json` module for both directions
+- If `orjson` isn't installed, we fall back to `json` transparently
+
+Key Concepts:
+- **Optional Dependencies**: Use a faster library when available,
+  without making it a hard requirement
+- **bytes vs str**: HTTP bodies are bytes; orjson works with bytes
+  natively, which saves an encode/decode step
+
+Learning Points:
+- Keep third-party details behind a small interface: callers only see
+  loads() / dumps() / dumps_bytes() / dumps_pretty()
+- The output is compact JSON (no spaces after ',' and ':') with either
+  backend, so cache keys built from it are stable
+"""
+
+import json
+from typing import Any, Callable, Optional, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def loads(data: Union[bytes, bytearray, str]) -> Any:
+    """
+    Decode JSON from bytes or str.
+
+    Args:
+        data: JSON document (e.g. response.content or an NDJSON line)
+
+    Returns:
+        Decoded Python object
+
+    Raises:
+        ValueError: If data is not valid JSON (json.JSONDecodeError and
+            orjson.JSONDecodeError are both ValueError subclasses)
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps_bytes(
+    obj: Any,
+    sort_keys: bool = False,
+    default: Optional[Callable[[Any], Any]] = None
+) -> bytes:
+    """
+    Encode an object as compact UTF-8 JSON bytes.
+
+    Args:
+        obj: Object to encode
+        sort_keys: Sort dict keys (useful for cache keys)
+        default: Called for objects that aren't JSON serializable
+
+    Returns:
+        JSON document as bytes, ready to send as an HTTP body
+
+    Learning Point:
+        Sending bytes with `data=` instead of `json=` lets requests skip
+        its own (stdlib) json.dumps call.
+    """
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(obj, default=default, option=option)
+    return json.dumps(
+        obj, sort_keys=sort_keys, default=default,
+        separators=(",", ":"), ensure_ascii=False
+    ).encode("utf-8")
+
+
+def dumps(
+    obj: Any,
+    sort_keys: bool = False,
+    default: Optional[Callable[[Any], Any]] = None
+) -> str:
+    """
+    Encode an object as a compact JSON string.
+
+    Args:
+        obj: Object to encode
+        sort_keys: Sort dict keys (useful for cache keys)
+        default: Called for objects that aren't JSON serializable
+
+    Returns:
+        JSON document as str
+    """
+    return dumps_bytes(obj, sort_keys=sort_keys, default=default).decode("utf-8")
+
+
+def dumps_pretty(obj: Any) -> str:
+    """
+    Encode an object as JSON indented by 2 spaces (for display).
+
+    Args:
+        obj: Object to encode
+
+    Returns:
+        Indented JSON document as str
+    """
+    if orjson is not None:
+        return orjson.dumps(
+            obj, default=str, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+        ).decode("utf-8")
+    return json.dumps(obj, indent=2, default=str, ensure_ascii=False)
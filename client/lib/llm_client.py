@@ -39,13 +39,92 @@ Real-World Example:
 """
 
 import requests
-import json
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import hashlib
+import socket
+import threading
 import time
 import re
-from typing import List, Dict, Any, Optional, Tuple
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+from typing import List, Dict, Any, Optional, Tuple, Generator, Callable, Iterable
 from lib.ui import print_success, print_error, print_info, print_llm_thought
 from lib.config import get_config
 from lib.sanitizers import clean_json_text
+from lib import json_utils
+
+
+# A JSON object somewhere in a reply: from the first '{' to the last '}'.
+# Compiled once at import, not looked up in re's cache on every reply.
+_JSON_BLOCK_RE = re.compile(r"\{.*\}", re.DOTALL)
+
+
+class CircuitBreaker:
+    """
+    Stop calling a service that keeps failing, for a while.
+
+    States:
+    - closed: requests go through; failures are counted
+    - open: after `max_failures` failures within `window` seconds, requests
+      fail immediately (no network call) for `cooldown` seconds
+    - half-open: after the cooldown one request is let through; success
+      closes the breaker, failure opens it again
+
+    Learning Point:
+        When Ollama is down, every request would otherwise wait for a
+        connection timeout. A tripped breaker turns that wait into an
+        instant error, and the service gets time to recover.
+    """
+
+    def __init__(self, max_failures: int = 3, window: float = 30.0, cooldown: float = 30.0):
+        self.max_failures = max_failures
+        self.window = window
+        self.cooldown = cooldown
+        self.failures = 0
+        self.first_failure_at: Optional[float] = None
+        self.opened_at: Optional[float] = None
+        # Set while the trial request after a cooldown is out
+        self.half_open = False
+
+    def allow(self) -> bool:
+        """Return True if a request may be attempted now."""
+        if self.opened_at is None:
+            return True
+        if time.monotonic() - self.opened_at < self.cooldown:
+            return False
+        # Half-open: allow a trial request; a single failure reopens.
+        # An explicit flag, not a failure count: the trial can outlast
+        # `window` (it may wait for the whole request timeout)
+        self.opened_at = None
+        self.half_open = True
+        return True
+
+    def remaining(self) -> float:
+        """Seconds until an open breaker lets a request through again."""
+        if self.opened_at is None:
+            return 0.0
+        return max(0.0, self.cooldown - (time.monotonic() - self.opened_at))
+
+    def record_success(self):
+        self.half_open = False
+        self.failures = 0
+        self.first_failure_at = None
+        self.opened_at = None
+
+    def record_failure(self):
+        now = time.monotonic()
+        if self.half_open:
+            self.half_open = False
+            self.opened_at = now
+            return
+        if self.first_failure_at is None or now - self.first_failure_at > self.window:
+            self.failures = 0
+            self.first_failure_at = now
+        self.failures += 1
+        if self.failures >= self.max_failures:
+            self.opened_at = now
 
 
 class LLMClient:
@@ -68,11 +147,29 @@ class LLMClient:
         - Swap out Ollama for other LLM providers easily
     """
 
+    # Instructions sent as the first message of every conversation
+    # (see build_system_prompt)
+    SYSTEM_PROMPT = """You are a smart assistant with access to a database and a file system.
+
+WHEN USING THE DATABASE:
+1. The schema has 'users' (id, username, email) and 'notes' (id, user_id, title, content).
+2. To find who wrote a note, you MUST JOIN tables: `SELECT u.username FROM users u JOIN notes n ON u.id = n.user_id ...`
+3. Use ILIKE for case-insensitive search (e.g. `title ILIKE '%shopping%'`).
+4. ALWAYS put single quotes around string values! (Correct: `'%shopping%'`, Wrong: `%shopping%`)
+5. DO NOT use `+` to concatenate strings. Use standard SQL syntax.
+6. Example of a correct query:
+   `SELECT u.username FROM users u JOIN notes n ON u.id = n.user_id WHERE n.title ILIKE '%deployment%'`
+"""
+
     def __init__(
         self,
         ollama_url: Optional[str] = None,
         model_name: Optional[str] = None,
-        timeout: int = 120
+        timeout: int = 120,
+        cache_size: int = 100,
+        cache_ttl: Optional[float] = None,
+        max_context_tokens: int = 4096,
+        keep_last_messages: int = 6
     ):
         """
         Initialize LLM client.
@@ -81,6 +178,12 @@ class LLMClient:
             ollama_url: Base URL of Ollama server (defaults to config)
             model_name: Model to use (defaults to config)
             timeout: Request timeout in seconds (default: 120)
+            cache_size: Most chat() responses to keep (default: 100)
+            cache_ttl: Seconds a cached response stays valid (defaults to
+                config, MCP_LLM_CACHE_TTL; 0 disables - the default)
+            max_context_tokens: Estimated history size above which older
+                tool results are summarized (default: 4096, 0 disables)
+            keep_last_messages: Most recent messages never summarized (default: 6)
 
         Learning Point:
             LLM requests can be slow (especially for complex queries),
@@ -89,7 +192,293 @@ class LLMClient:
         config = get_config()
         self.ollama_url = (ollama_url or config.ollama_url).rstrip('/')
         self.model_name = model_name or config.model_name
+        self.keep_alive = config.ollama_keep_alive
         self.timeout = timeout
+        self.cache_size = cache_size
+        self.cache_ttl = config.llm_cache_ttl if cache_ttl is None else cache_ttl
+        self.max_context_tokens = max_context_tokens
+        self.keep_last_messages = keep_last_messages
+
+        # Recent chat() responses: payload digest -> (response bytes, expires at).
+        # Ordered oldest-used first, so the least recently used entry is evicted.
+        self._response_cache: "OrderedDict[bytes, Tuple[bytes, float]]" = OrderedDict()
+        self._response_cache_lock = threading.Lock()
+
+        # One HTTP session for all requests to Ollama
+        # Learning Point: a Session keeps connections open (HTTP keep-alive),
+        # so every chat() after the first skips the TCP (and TLS) handshake.
+        # The retry policy quietly retries failed connections and gateway
+        # errors (502/503/504, e.g. Ollama restarting) with backoff. A read
+        # timeout or a connection dropped mid-reply is not retried: Ollama
+        # already spent up to `timeout` seconds generating, and trying again
+        # would make the caller wait that long once more.
+        self._session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=16,
+            pool_maxsize=32,
+            max_retries=Retry(
+                total=2,
+                read=0,
+                other=0,
+                backoff_factor=0.2,
+                status_forcelist=(502, 503, 504),
+                # Status retries are limited to POST-safe cases: a gateway
+                # error or a refused connection means Ollama never ran the
+                # request, so sending it again can't do the work twice
+                allowed_methods=None,
+                # Hand the last response back so raise_for_status() reports it
+                raise_on_status=False
+            )
+        )
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+
+        # Serialized tool schemas, reused while the same tools list is passed
+        # (see _build_payload): (tools list, bytes). Holding the list keeps
+        # its id() from being reused; one tuple is swapped in atomically.
+        self._tools_blob: Tuple[Optional[List[Dict[str, Any]]], bytes] = (None, b"[]")
+        # Serialized messages of the last request: id(message) -> (message, bytes)
+        self._message_blobs: Dict[int, Tuple[Dict[str, Any], bytes]] = {}
+
+        # Summaries of old tool results: id(message) -> (message, summary).
+        # Reusing the same summary object keeps the payload cache hitting.
+        self._summaries: Dict[int, Tuple[Dict[str, Any], Dict[str, Any]]] = {}
+
+        # Fail fast when Ollama is down (see CircuitBreaker)
+        self._breaker = CircuitBreaker()
+        self._connection_checked = False
+
+    def close(self):
+        """
+        Close the pooled HTTP connections to Ollama.
+
+        Example:
+            with LLMClient() as llm:
+                response = llm.chat(messages)
+        """
+        self._session.close()
+
+    def clear_cache(self):
+        """
+        Clear cached chat() responses.
+
+        Call this when the data behind the tools changed, so the same
+        question is answered from fresh tool results.
+        """
+        with self._response_cache_lock:
+            self._response_cache.clear()
+
+    def _cache_get(self, key: bytes) -> Optional[bytes]:
+        """Return a cached response body, or None if missing or expired."""
+        with self._response_cache_lock:
+            cached = self._response_cache.get(key)
+            if cached is None:
+                return None
+            if cached[1] <= time.monotonic():
+                del self._response_cache[key]
+                return None
+            self._response_cache.move_to_end(key)
+            return cached[0]
+
+    def _cache_put(self, key: bytes, body: bytes):
+        """Store a response body, evicting the least recently used entries."""
+        with self._response_cache_lock:
+            self._response_cache[key] = (body, time.monotonic() + self.cache_ttl)
+            self._response_cache.move_to_end(key)
+            while len(self._response_cache) > self.cache_size:
+                self._response_cache.popitem(last=False)
+
+    def __enter__(self) -> "LLMClient":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def check_connection(self, timeout: float = 0.5) -> bool:
+        """
+        Check that Ollama's port accepts TCP connections.
+
+        This is much cheaper than a chat request: no payload is sent,
+        and an unreachable host is detected within `timeout` seconds.
+
+        Returns:
+            True if a connection could be opened
+        """
+        parts = urlsplit(self.ollama_url)
+        port = parts.port or (443 if parts.scheme == "https" else 80)
+        try:
+            with socket.create_connection((parts.hostname, port), timeout=timeout):
+                return True
+        except OSError:
+            return False
+
+    def _before_request(self):
+        """
+        Refuse to send a request that is known to fail.
+
+        Raises:
+            ConnectionError: If the circuit breaker is open, or if the
+                first connection check of this client fails
+        """
+        if not self._breaker.allow():
+            raise ConnectionError(
+                f"Ollama at {self.ollama_url} failed repeatedly; "
+                f"not retrying for another {self._breaker.remaining():.0f}s."
+            )
+
+        if not self._connection_checked:
+            if not self.check_connection():
+                self._breaker.record_failure()
+                raise ConnectionError(
+                    f"Cannot connect to Ollama at {self.ollama_url}\n"
+                    f"Make sure Ollama is running: docker compose ps"
+                )
+            self._connection_checked = True
+
+    @staticmethod
+    def estimate_tokens(message: Dict[str, Any]) -> int:
+        """
+        Roughly estimate how many tokens a message takes.
+
+        About 4 characters per token for English text, plus a few tokens of
+        per-message overhead. Good enough to decide when to compact; no
+        tokenizer for the model is needed.
+        """
+        content = message.get("content") or ""
+        if not isinstance(content, str):
+            content = str(content)
+        return len(content) // 4 + 4
+
+    def compact_messages(self, messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Keep the conversation within max_context_tokens.
+
+        When the estimated size is over the limit, every tool result older
+        than the last keep_last_messages messages is replaced with a one-line
+        summary ("tool read_file returned 5120 characters"). The system
+        prompt, the user's messages and the assistant's messages are kept.
+
+        Results of the current turn (the ones after the last assistant
+        message that called tools) are never summarized, however many
+        there are: the model hasn't read them yet.
+
+        Args:
+            messages: Conversation history
+
+        Returns:
+            `messages` itself if it fits, otherwise a compacted copy
+
+        Learning Point:
+            The time an LLM needs to read its prompt grows faster than the
+            prompt itself, and old tool output (whole files, long query
+            results) is usually the bulk of it. The model already used those
+            results; a short note that they existed is enough later on.
+            The summary stays a "tool" message, so every tool call still
+            has its answer.
+        """
+        if self.max_context_tokens <= 0:
+            return messages
+        if sum(self.estimate_tokens(message) for message in messages) <= self.max_context_tokens:
+            return messages
+
+        # Only tool results the model already answered from may go: stop at
+        # the last assistant message that called tools
+        cut = len(messages) - self.keep_last_messages
+        for index in range(len(messages) - 1, -1, -1):
+            message = messages[index]
+            if message.get("role") == "assistant" and message.get("tool_calls"):
+                cut = min(cut, index)
+                break
+
+        previous = self._summaries
+        self._summaries = {}
+        compacted = []
+        pending_names: List[str] = []
+
+        for index, message in enumerate(messages):
+            role = message.get("role")
+            if role == "assistant":
+                # Tool results follow their assistant message, in call order
+                pending_names = [
+                    call.get("function", {}).get("name", "unknown")
+                    for call in message.get("tool_calls") or []
+                ]
+            elif role == "tool":
+                name = pending_names.pop(0) if pending_names else "unknown"
+                if index < cut:
+                    cached = previous.get(id(message))
+                    if cached is None or cached[0] is not message:
+                        summary = {
+                            "role": "tool",
+                            "content": f"[summary: tool {name} returned "
+                                       f"{len(message.get('content') or '')} characters]"
+                        }
+                        cached = (message, summary)
+                    self._summaries[id(message)] = cached
+                    compacted.append(cached[1])
+                    continue
+            compacted.append(message)
+
+        return compacted
+
+    def _build_payload(
+        self,
+        messages: List[Dict[str, str]],
+        tools: List[Dict[str, Any]],
+        stream: bool
+    ) -> bytes:
+        """
+        Serialize a /api/chat request body.
+
+        The tool schemas are the same on every call of a conversation (and
+        usually the largest part of the payload), so they are serialized
+        once and spliced into each request as pre-encoded bytes.
+
+        The layout never changes (system prompt first, new messages only
+        appended), so consecutive requests share a byte-identical prefix
+        that Ollama can reuse from its prompt cache while the model stays
+        loaded (keep_alive).
+
+        Messages work the same way: the synthesis request repeats every
+        message of the reasoning request, so each message already sent is
+        reused as bytes and only the new ones are serialized.
+
+        Learning Point:
+            Pass the same tools list object to reuse the cached bytes.
+            Both caches are keyed by identity, so build new objects (rather
+            than mutating old ones) when tools or messages change -
+            add_tool_results() returns a new list of the same message
+            objects plus the new ones, which is exactly that.
+        """
+        messages = self.compact_messages(messages)
+
+        tools_ref, tools_blob = self._tools_blob
+        if tools is not tools_ref:
+            tools_blob = json_utils.dumps_bytes(tools)
+            self._tools_blob = (tools, tools_blob)
+
+        # Keep only this request's messages, so the cache can't grow
+        previous = self._message_blobs
+        current = {}
+        blobs = []
+        for message in messages:
+            cached = previous.get(id(message))
+            if cached is None or cached[0] is not message:
+                cached = (message, json_utils.dumps_bytes(message))
+            current[id(message)] = cached
+            blobs.append(cached[1])
+        self._message_blobs = current
+
+        messages_blob = b",".join(blobs)
+
+        return b"".join((
+            b'{"model":', json_utils.dumps_bytes(self.model_name),
+            b',"messages":[', messages_blob, b"]",
+            b',"tools":', tools_blob,
+            b',"stream":', b"true" if stream else b"false",
+            b',"keep_alive":', json_utils.dumps_bytes(self.keep_alive),
+            b"}"
+        ))
 
     def build_system_prompt(self) -> str:
         """
@@ -110,27 +499,23 @@ class LLMClient:
 
             Good prompting is an art (and increasingly a science!)
 
+            The text is the SYSTEM_PROMPT class constant: it is built once,
+            every conversation shares the same string object, and a subclass
+            can swap it by overriding the attribute.
+
         Example:
             "You are a helpful SQL assistant. Always use ILIKE for
              case-insensitive searches. Never use SELECT *."
         """
-        return """You are a smart assistant with access to a database and a file system.
-
-WHEN USING THE DATABASE:
-1. The schema has 'users' (id, username, email) and 'notes' (id, user_id, title, content).
-2. To find who wrote a note, you MUST JOIN tables: `SELECT u.username FROM users u JOIN notes n ON u.id = n.user_id ...`
-3. Use ILIKE for case-insensitive search (e.g. `title ILIKE '%shopping%'`).
-4. ALWAYS put single quotes around string values! (Correct: `'%shopping%'`, Wrong: `%shopping%`)
-5. DO NOT use `+` to concatenate strings. Use standard SQL syntax.
-6. Example of a correct query:
-   `SELECT u.username FROM users u JOIN notes n ON u.id = n.user_id WHERE n.title ILIKE '%deployment%'`
-"""
+        return self.SYSTEM_PROMPT
 
     def chat(
         self,
         messages: List[Dict[str, str]],
         tools: List[Dict[str, Any]],
-        stream: bool = False
+        stream: bool = False,
+        use_cache: bool = True,
+        on_token: Optional[Callable[[str], None]] = None
     ) -> Dict[str, Any]:
         """
         Send a chat request to the LLM.
@@ -141,7 +526,15 @@ WHEN USING THE DATABASE:
         Args:
             messages: List of message objects with 'role' and 'content'
             tools: List of available tools in Ollama format
-            stream: Whether to stream the response (default: False)
+            stream: Whether to stream the response (default: False).
+                The streamed chunks are put back together, so the return
+                value has the same shape either way (see collect_stream()).
+            use_cache: Answer a repeated request from the response cache
+                when it is enabled (cache_ttl > 0; default: True). Pass False
+                when sampling should vary. Streamed requests, and requests
+                carrying tool results, are never cached.
+            on_token: With stream=True, called with each piece of content
+                as soon as it arrives
 
         Returns:
             Response from Ollama containing the LLM's message
@@ -162,48 +555,233 @@ WHEN USING THE DATABASE:
             >>> print(response["message"]["content"])
             'Hi! How can I help you today?'
         """
+        if stream:
+            return self.collect_stream(self.chat_stream(messages, tools), on_token)
+
+        payload = self._build_payload(messages, tools, stream)
+
+        # Learning Point: an identical request (same model, messages and
+        # tools) gets the same answer, so a recent one is reused without a
+        # round-trip. The payload bytes are already canonical, so their
+        # digest is the cache key. A turn that used tools is not cached:
+        # its tool results may already be out of date when asked again.
+        cache_key = None
+        if (use_cache and not stream and self.cache_ttl > 0
+                and not any(message.get("role") == "tool" for message in messages)):
+            cache_key = hashlib.blake2b(payload, digest_size=16).digest()
+            cached = self._cache_get(cache_key)
+            if cached is not None:
+                print_success("Ollama response served from cache")
+                return json_utils.loads(cached)
+
         print_info(f"Sending request to Ollama ({self.model_name})...")
 
-        payload = {
-            "model": self.model_name,
-            "messages": messages,
-            "tools": tools,
-            "stream": stream
-        }
+        self._before_request()
 
         try:
             start_time = time.time()
 
-            response = requests.post(
+            response = self._session.post(
                 f"{self.ollama_url}/api/chat",
-                json=payload,
+                data=payload,
+                headers={"Content-Type": "application/json"},
                 timeout=self.timeout
             )
 
             duration = time.time() - start_time
 
             response.raise_for_status()
+            self._breaker.record_success()
 
             print_success(f"Ollama responded in {duration:.2f}s")
 
-            return response.json()
+            if cache_key is not None:
+                self._cache_put(cache_key, response.content)
+
+            return json_utils.loads(response.content)
+
+        except requests.exceptions.RequestException as e:
+            self._raise_request_error(e)
+
+    def chat_batch(
+        self,
+        conversations: List[List[Dict[str, Any]]],
+        tools: List[Dict[str, Any]],
+        max_concurrency: int = 4
+    ) -> List[Dict[str, Any]]:
+        """
+        Send several independent chat requests at the same time.
+
+        Args:
+            conversations: One message list per request
+            tools: Available tools (shared by all requests)
+            max_concurrency: Most requests in flight at once (default: 4,
+                Ollama's usual OLLAMA_NUM_PARALLEL)
+
+        Returns:
+            The responses, in the same order as `conversations`
+
+        Raises:
+            ConnectionError / ValueError: The first error of any request,
+                as chat() would raise it
+
+        Learning Point:
+            A thread spends almost all of a chat() call waiting on the
+            network, and waiting threads release the GIL. So N requests in
+            threads take about as long as the slowest one, not the sum -
+            as long as the server runs them in parallel. The pool size
+            caps how many are in flight, so Ollama isn't flooded.
 
-        except requests.exceptions.Timeout:
+        Example:
+            >>> answers = client.chat_batch(
+            ...     [client.create_conversation("Hi"), client.create_conversation("Bye")],
+            ...     tools=[]
+            ... )
+        """
+        if not conversations:
+            return []
+
+        workers = max(1, min(max_concurrency, len(conversations)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="llm-chat") as pool:
+            return list(pool.map(lambda messages: self.chat(messages, tools), conversations))
+
+    def chat_stream(
+        self,
+        messages: List[Dict[str, str]],
+        tools: List[Dict[str, Any]]
+    ) -> Generator[Dict[str, Any], None, None]:
+        """
+        Send a chat request and yield the response chunk by chunk.
+
+        With "stream": true, Ollama answers with newline-delimited JSON:
+        one object per generated token (or small group of tokens), each
+        carrying a partial message, and a last object with "done": true.
+
+        Args:
+            messages: List of message objects with 'role' and 'content'
+            tools: List of available tools in Ollama format
+
+        Yields:
+            Each JSON chunk from Ollama, e.g.
+            {"message": {"role": "assistant", "content": "Al"}, "done": false}
+
+        Raises:
+            ConnectionError: If cannot connect to Ollama
+            ValueError: If Ollama returns an error
+
+        Learning Point:
+            Streaming doesn't make the LLM faster, it makes it *feel*
+            faster: the first words show up after one token instead of
+            after the whole answer has been generated.
+
+        Example:
+            >>> for chunk in client.chat_stream(messages, tools=[]):
+            ...     print(chunk["message"]["content"], end="", flush=True)
+        """
+        print_info(f"Streaming response from Ollama ({self.model_name})...")
+
+        self._before_request()
+        payload = self._build_payload(messages, tools, True)
+
+        try:
+            start_time = time.time()
+
+            with self._session.post(
+                f"{self.ollama_url}/api/chat",
+                data=payload,
+                headers={"Content-Type": "application/json"},
+                timeout=self.timeout,
+                stream=True
+            ) as response:
+                response.raise_for_status()
+                self._breaker.record_success()
+
+                for line in response.iter_lines():
+                    if not line:
+                        continue
+                    chunk = json_utils.loads(line)
+                    if "error" in chunk:
+                        raise ValueError(f"Ollama returned error: {chunk['error']}")
+                    yield chunk
+                    if chunk.get("done"):
+                        break
+
+            duration = time.time() - start_time
+            print_success(f"Ollama finished streaming in {duration:.2f}s")
+
+        except requests.exceptions.RequestException as e:
+            self._raise_request_error(e)
+
+    @staticmethod
+    def collect_stream(
+        chunks: Iterable[Dict[str, Any]],
+        on_token: Optional[Callable[[str], None]] = None
+    ) -> Dict[str, Any]:
+        """
+        Put streamed chunks back together into one non-streamed response.
+
+        Args:
+            chunks: Chunks from chat_stream()
+            on_token: Called with each piece of content as it arrives
+
+        Returns:
+            A response shaped like chat()'s: the last chunk's fields (timings,
+            "done": true) with a single message holding the whole content and
+            any tool calls, so parse_tool_calls() works unchanged.
+
+        Learning Point:
+            The pieces are collected in a list and joined once at the end.
+            Adding them to a string one by one (text += piece) copies the
+            text so far on every token, which is quadratic for long answers.
+        """
+        parts: List[str] = []
+        tool_calls: List[Dict[str, Any]] = []
+        last: Dict[str, Any] = {}
+        role = "assistant"
+
+        for chunk in chunks:
+            last = chunk
+            message = chunk.get("message") or {}
+            role = message.get("role", role)
+            piece = message.get("content")
+            if piece:
+                parts.append(piece)
+                if on_token is not None:
+                    on_token(piece)
+            if message.get("tool_calls"):
+                tool_calls.extend(message["tool_calls"])
+
+        message = {"role": role, "content": "".join(parts)}
+        if tool_calls:
+            message["tool_calls"] = tool_calls
+        return {**last, "message": message}
+
+    def _raise_request_error(self, e: requests.exceptions.RequestException):
+        """Translate a requests exception into ConnectionError/ValueError."""
+        # Network failures and server errors count towards the breaker
+        response = getattr(e, "response", None)
+        if (isinstance(e, (requests.exceptions.Timeout, requests.exceptions.ConnectionError))
+                or (response is not None and response.status_code >= 500)):
+            self._breaker.record_failure()
+
+        if isinstance(e, requests.exceptions.Timeout):
             raise ConnectionError(
                 f"Ollama did not respond within {self.timeout}s.\n"
                 f"The query might be too complex, or the server is overloaded."
             )
 
-        except requests.exceptions.ConnectionError as e:
+        if isinstance(e, requests.exceptions.ConnectionError):
             raise ConnectionError(
                 f"Cannot connect to Ollama at {self.ollama_url}\n"
                 f"Make sure Ollama is running: docker compose ps\n"
                 f"Technical details: {e}"
             )
 
-        except requests.exceptions.HTTPError as e:
+        if isinstance(e, requests.exceptions.HTTPError):
             raise ValueError(f"Ollama returned error: {e}")
 
+        raise e
+
     def parse_tool_calls(
         self,
         message: Dict[str, Any]
@@ -255,43 +833,54 @@ WHEN USING THE DATABASE:
         if not content:
             return None, False
 
-        # Try to find JSON in content
-        json_match = re.search(r"(\{.*\})", content, re.DOTALL)
+        # Try to find JSON in content (this also matches content that is
+        # nothing but a JSON object). Most replies are plain answers with no
+        # '{' at all; the substring test rules those out without the regex.
+        json_match = _JSON_BLOCK_RE.search(content) if "{" in content else None
+        if json_match:
+            tool_calls = self._tool_call_from_json(json_match.group())
+            if tool_calls:
+                return tool_calls, False
 
-        if json_match or (content.startswith("{") and content.endswith("}")):
-            json_str = json_match.group(1) if json_match else content
-
-            # Clean up invalid escapes
-            json_str = clean_json_text(json_str)
+        # No tool calls found - this is a direct answer
+        print_llm_thought("The model decided to answer directly without tools.")
+        return None, True
 
-            try:
-                print_info("Attempting to parse raw JSON from content (fallback)...")
-                fake_tool = json.loads(json_str)
+    @staticmethod
+    def _tool_call_from_json(json_str: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        Turn a JSON object written in the reply text into a tool call.
 
-                # Check if it looks like a tool call
-                if "name" in fake_tool and ("parameters" in fake_tool or "arguments" in fake_tool):
-                    print_llm_thought("The model sent a direct JSON response. Converting to tool call.")
+        Returns:
+            A one-element tool call list, or None if the text isn't valid
+            JSON or doesn't look like a tool call
+        """
+        # Clean up invalid escapes
+        json_str = clean_json_text(json_str)
 
-                    # Normalize between "parameters" and "arguments"
-                    args = fake_tool.get("parameters") or fake_tool.get("arguments")
+        try:
+            print_info("Attempting to parse raw JSON from content (fallback)...")
+            fake_tool = json_utils.loads(json_str)
+        except ValueError as e:  # JSONDecodeError from either backend
+            print_error(f"JSON parse failed even after cleanup: {e}")
+            # Not a tool call, treat as direct answer
+            return None
 
-                    tool_calls = [{
-                        "function": {
-                            "name": fake_tool["name"],
-                            "arguments": args
-                        }
-                    }]
+        # Check if it looks like a tool call
+        if "name" not in fake_tool or not ("parameters" in fake_tool or "arguments" in fake_tool):
+            return None
 
-                    return tool_calls, False
+        print_llm_thought("The model sent a direct JSON response. Converting to tool call.")
 
-            except json.JSONDecodeError as e:
-                print_error(f"JSON parse failed even after cleanup: {e}")
-                # Not a tool call, treat as direct answer
-                pass
+        # Normalize between "parameters" and "arguments"
+        args = fake_tool.get("parameters") or fake_tool.get("arguments")
 
-        # No tool calls found - this is a direct answer
-        print_llm_thought("The model decided to answer directly without tools.")
-        return None, True
+        return [{
+            "function": {
+                "name": fake_tool["name"],
+                "arguments": args
+            }
+        }]
 
     def create_conversation(
         self,
@@ -347,7 +936,8 @@ WHEN USING THE DATABASE:
             tool_results: Results from executing the tools
 
         Returns:
-            Updated conversation history
+            A new list: the conversation history followed by the assistant
+            message and the tool results. `messages` itself is not changed.
 
         Learning Point:
             The LLM needs to see its own tool call request in the history,
@@ -369,10 +959,7 @@ WHEN USING THE DATABASE:
             >>> len(updated)
             3
         """
-        # Add assistant's tool call request
-        messages.append(assistant_message)
-
-        # Add tool results
-        messages.extend(tool_results)
-
-        return messages
+        # Build the longer history in one step instead of mutating the
+        # caller's list; the message objects themselves are shared, so the
+        # per-message payload cache in _build_payload still hits
+        return [*messages, assistant_message, *tool_results]
@@ -36,14 +36,159 @@ Example:
 """
 
 import asyncio
-from typing import List, Dict, Any, Optional
+import contextvars
+import hashlib
+import os
+import threading
+import time
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Set, AsyncIterator, Iterable, Awaitable, TypeVar
+
+import httpx
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
 from lib.ui import print_success, print_error, print_info
 from lib.config import get_config
+from lib import json_utils
 
 # Import MCP SDK components
 from mcp import ClientSession
 from mcp.client.streamable_http import streamablehttp_client
 
+try:
+    # Newer SDKs accept an existing httpx client (see shared_http_client)
+    from mcp.client.streamable_http import streamable_http_client
+except ImportError:
+    streamable_http_client = None
+
+
+# Most tool-schema files kept on disk; the least recently written go first
+MAX_TOOLS_CACHE_FILES = 32
+
+# Input schema of a tool that takes no arguments. Shared by every such
+# tool (never modified), so it isn't rebuilt for each one
+_EMPTY_SCHEMA: Dict[str, Any] = {"type": "object", "properties": {}}
+
+# The httpx client of the innermost shared_http_client() block, if any.
+# A ContextVar is copied into every task created inside the block, so
+# concurrent calls see it without passing it around.
+_shared_http: contextvars.ContextVar[Optional[httpx.AsyncClient]] = contextvars.ContextVar(
+    "mcp_shared_http", default=None
+)
+
+
+T = TypeVar("T")
+
+# The event loop all MCP work runs on (see run_sync)
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_lock = threading.Lock()
+
+
+def background_loop() -> asyncio.AbstractEventLoop:
+    """
+    Return the event loop that runs in a background thread, starting it once.
+
+    Learning Point:
+        asyncio.run() builds a new event loop for every call and closes it
+        afterwards, and everything async that was opened on that loop
+        (MCP sessions, HTTP connections) has to be closed with it. A loop
+        that runs for the whole process in its own thread lets sessions
+        stay open between calls from synchronous code.
+    """
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            # uvloop (libuv) is a faster drop-in loop for socket-heavy
+            # work; the standard loop is used when it isn't installed
+            loop = uvloop.new_event_loop() if uvloop is not None else asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="mcp-event-loop", daemon=True).start()
+            _loop = loop
+    return _loop
+
+
+def run_sync(coro: Awaitable[T]) -> T:
+    """
+    Run a coroutine on the background loop and wait for its result.
+
+    This is the bridge from synchronous code (the agent loop, Streamlit)
+    to the async MCP code. It may be called from any thread except the
+    loop's own.
+
+    Raises:
+        Whatever the coroutine raised
+    """
+    loop = background_loop()
+    if threading.current_thread().name == "mcp-event-loop":
+        raise RuntimeError("run_sync() called from the MCP event loop; await the coroutine instead")
+    future = asyncio.run_coroutine_threadsafe(coro, loop)
+    try:
+        return future.result()
+    except BaseException:
+        # e.g. Ctrl+C while waiting: don't leave the work running
+        future.cancel()
+        raise
+
+
+def _network_error(error: BaseException) -> Optional[BaseException]:
+    """
+    Find the network failure behind an error, if it is one.
+
+    Exception groups are searched recursively. Anything else (a protocol
+    error from the server, a bug) returns None and is not reported as
+    "server unreachable".
+    """
+    if isinstance(error, (httpx.HTTPError, OSError)):
+        return error
+    if isinstance(error, BaseExceptionGroup):
+        for inner in error.exceptions:
+            cause = _network_error(inner)
+            if cause is not None:
+                return cause
+    return None
+
+
+@asynccontextmanager
+async def shared_http_client() -> AsyncIterator[Optional[httpx.AsyncClient]]:
+    """
+    Let every MCPClient inside the block use one HTTP connection pool.
+
+    Without it, each session opens its own httpx client (and its own TCP
+    connections). Inside the block, sessions to any server borrow pooled
+    keep-alive connections from one client, which is closed when the
+    block exits. Nested blocks reuse the outer client.
+
+    Example:
+        async with shared_http_client():
+            await asyncio.gather(file_client.get_tools(), db_client.get_tools())
+
+    Learning Point:
+        An async HTTP client belongs to the event loop it was created on.
+        All MCP work here runs on one persistent loop (background_loop(),
+        reached through run_sync()), so a pool made inside the block is
+        valid for every session in it. Scoping it to a block rather than
+        the process means its connections are closed when the work is
+        done, and the context variable keeps it to the tasks inside.
+    """
+    client = _shared_http.get()
+    if client is not None or streamable_http_client is None:
+        # Already shared, or an SDK too old to accept a shared client
+        yield client
+        return
+
+    async with httpx.AsyncClient(
+        # The MCP SDK's defaults: servers may hold a response stream open
+        timeout=httpx.Timeout(30.0, read=300.0),
+        limits=httpx.Limits(max_connections=64, max_keepalive_connections=32)
+    ) as client:
+        token = _shared_http.set(client)
+        try:
+            yield client
+        finally:
+            _shared_http.reset(token)
+
 
 class MCPClient:
     """
@@ -82,6 +227,30 @@ class MCPClient:
             self.server_url = f"{self.server_url}/mcp"
         self.timeout = timeout
         self._tools_cache: Optional[List[Dict[str, Any]]] = None
+        # Live session while connected (see connect()), and the task that owns it
+        self._shared_session: Optional[ClientSession] = None
+        self._session_task: Optional[asyncio.Task] = None
+        self._ready: Optional[asyncio.Future] = None
+        self._closing: Optional[asyncio.Event] = None
+
+        # Tool schemas survive restarts in one small file per server URL
+        # (and tool cap, so changing MCP_MAX_TOOLS doesn't reuse a list
+        # cut at the old cap)
+        config = get_config()
+        self._max_tools = config.max_tools
+        key = f"{self.server_url}|{self._max_tools}".encode()
+        digest = hashlib.blake2b(key, digest_size=8).hexdigest()
+        self._tools_cache_path = Path(config.tools_cache_dir) / f"tools-{digest}.json"
+        self._tools_cache_ttl = config.tools_cache_ttl
+        # Background re-discovery after a disk cache hit (see get_tools)
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    def _transport(self):
+        """Open the streamable-HTTP transport, on the shared pool if there is one."""
+        client = _shared_http.get()
+        if client is not None:
+            return streamable_http_client(self.server_url, http_client=client)
+        return streamablehttp_client(self.server_url)
 
     async def get_tools(self, use_cache: bool = True) -> List[Dict[str, Any]]:
         """
@@ -102,45 +271,102 @@ class MCPClient:
         Learning Point:
             The SDK returns typed objects (Tool) which we convert to
             dictionaries for compatibility with the rest of the agent.
+
+            Tools read from the disk cache are returned at once, and the
+            server is asked again in the background so the next run sees
+            any change ("stale-while-revalidate").
         """
         if use_cache and self._tools_cache is not None:
             return self._tools_cache
 
+        if use_cache:
+            tools = self._load_tools_from_disk()
+            if tools is not None:
+                self._tools_cache = tools
+                print_success(f"Loaded {len(tools)} cached tools for {self.server_url}")
+                if self._refresh_task is None:
+                    self._refresh_task = asyncio.create_task(self._refresh_tools())
+                return tools
+
         try:
             print_info(f"Discovering tools from {self.server_url}...")
-
-            async with streamablehttp_client(self.server_url) as (read, write, _):
-                async with ClientSession(read, write) as session:
-                    # Initialize the session (required handshake)
-                    await session.initialize()
-
-                    # List available tools
-                    result = await session.list_tools()
-
-                    # Convert SDK Tool objects to dictionaries
-                    tools = []
-                    for tool in result.tools:
-                        tool_dict = {
-                            "name": tool.name,
-                            "description": tool.description or "",
-                            "inputSchema": tool.inputSchema if tool.inputSchema else {
-                                "type": "object",
-                                "properties": {}
-                            }
-                        }
-                        tools.append(tool_dict)
-
-                    self._tools_cache = tools
-                    print_success(f"Loaded {len(tools)} tools from {self.server_url}")
-                    return tools
-
-        except Exception as e:
-            print_error(f"Failed to discover tools from {self.server_url}: {e}")
+            tools = await self._list_tools()
+            self._tools_cache = tools
+            self._save_tools_to_disk(tools)
+            print_success(f"Loaded {len(tools)} tools from {self.server_url}")
+            return tools
+
+        except (httpx.HTTPError, OSError, BaseExceptionGroup) as e:
+            # The SDK runs the transport in a task group, so a network error
+            # usually arrives wrapped in an exception group
+            cause = _network_error(e)
+            if cause is None:
+                raise
+            print_error(f"Failed to discover tools from {self.server_url}: {cause}")
             raise ConnectionError(
                 f"Cannot connect to MCP server at {self.server_url}\n"
                 f"Make sure the server is running: docker compose ps\n"
-                f"Technical details: {e}"
-            )
+                f"Technical details: {cause}"
+            ) from e
+
+    async def _list_tools(self) -> List[Dict[str, Any]]:
+        """Ask the server for its tools, as dictionaries."""
+        if self._shared_session is not None:
+            # Connected (see connect()): no new handshake
+            return await self._read_tool_pages(self._shared_session)
+
+        async with self._transport() as (read, write, _):
+            async with ClientSession(read, write) as session:
+                # Initialize the session (required handshake)
+                await session.initialize()
+
+                # List available tools
+                return await self._read_tool_pages(session)
+
+    async def _read_tool_pages(self, session: ClientSession) -> List[Dict[str, Any]]:
+        """
+        Read the server's tool list page by page, up to max_tools.
+
+        Learning Point:
+            tools/list is paginated: a server with many tools returns
+            them in pages linked by a cursor. Every tool schema ends up
+            in the LLM prompt, so past a few dozen tools the model gets
+            slower and worse at choosing - there is no point in reading
+            (or parsing) more pages than we are going to keep.
+        """
+        tools = []
+        cursor = None
+        while True:
+            result = await (session.list_tools(cursor) if cursor else session.list_tools())
+
+            # Convert SDK Tool objects to dictionaries
+            for tool in result.tools:
+                if self._max_tools and len(tools) == self._max_tools:
+                    print_info(f"{self.server_url} has more than {self._max_tools} tools, keeping the first {self._max_tools}")
+                    return tools
+                tool_dict = {
+                    "name": tool.name,
+                    "description": tool.description or "",
+                    "inputSchema": tool.inputSchema or _EMPTY_SCHEMA
+                }
+                tools.append(tool_dict)
+
+            cursor = result.nextCursor
+            if not cursor:
+                return tools
+
+    async def _refresh_tools(self):
+        """Re-discover tools quietly and update both caches."""
+        # Runs after get_tools() returned, maybe past the end of a
+        # shared_http_client() block: use an HTTP client of its own
+        _shared_http.set(None)
+        try:
+            tools = await self._list_tools()
+        except Exception:
+            # Server unreachable: the cached tools are all we have
+            return
+        self._tools_cache = tools
+        self._save_tools_to_disk(tools)
 
     async def call_tool(self, name: str, arguments: Dict[str, Any]) -> Any:
         """
@@ -158,44 +384,312 @@ class MCPClient:
             We extract the content for our agent's use.
         """
         try:
-            async with streamablehttp_client(self.server_url) as (read, write, _):
+            # While connected, reuse the session (no new handshake)
+            if self._shared_session is not None:
+                result = await self._shared_session.call_tool(name, arguments)
+                return self._extract_content(result)
+
+            async with self._transport() as (read, write, _):
                 async with ClientSession(read, write) as session:
                     await session.initialize()
 
                     # Call the tool
                     result = await session.call_tool(name, arguments)
-
-                    # Extract content from result
-                    if result.content:
-                        # Handle different content types
-                        contents = []
-                        for item in result.content:
-                            if hasattr(item, 'text'):
-                                contents.append(item.text)
-                            elif hasattr(item, 'data'):
-                                contents.append(item.data)
-                            else:
-                                contents.append(str(item))
-
-                        # Return single item or list
-                        if len(contents) == 1:
-                            return contents[0]
-                        return contents
-
-                    return None
+                    return self._extract_content(result)
 
         except Exception as e:
             print_error(f"Failed to call tool {name}: {e}")
             raise
 
+    @staticmethod
+    def _extract_content(result: Any) -> Any:
+        """
+        Extract the content of a CallToolResult.
+
+        Returns:
+            A single item, a list of items, or None if there is no content
+        """
+        if result.content:
+            # Handle different content types: text, binary data (e.g.
+            # images), anything else as its string form. One getattr per
+            # kind does both the check and the read.
+            contents = [
+                text if (text := getattr(item, "text", None)) is not None
+                else data if (data := getattr(item, "data", None)) is not None
+                else str(item)
+                for item in result.content
+            ]
+
+            # Return single item or list
+            if len(contents) == 1:
+                return contents[0]
+            return contents
+
+        return None
+
+    async def connect(self):
+        """
+        Open one session that get_tools() and call_tool() reuse until aclose().
+
+        Without it, every call opens its own connection and repeats the MCP
+        handshake (initialize). Connected, a call is a single request on a
+        session that is already set up.
+
+        Raises:
+            Whatever opening the session raised (e.g. the server is down)
+
+        Learning Point:
+            The SDK's transport runs inside an anyio task group, and a task
+            group must be exited by the task that entered it. So the session
+            is opened and later closed by a small background task that owns
+            it; connect() and aclose() just start and stop that task. Any
+            task (e.g. each of several concurrent tool calls) can use the
+            session in between.
+        """
+        if self._session_task is not None:
+            if not self._session_task.done():
+                # Connected, or another caller is connecting: wait for it
+                await asyncio.shield(self._ready)
+                return
+            # The session dropped (e.g. the server restarted): reconnect
+            self._session_task = None
+
+        ready = asyncio.get_running_loop().create_future()
+        self._ready = ready
+        self._closing = asyncio.Event()
+        task = asyncio.create_task(self._hold_session(ready, self._closing))
+        self._session_task = task
+        try:
+            await ready
+        except BaseException:
+            # Failed to open, or connect() itself was cancelled
+            if self._session_task is task:
+                self._session_task = None
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+            raise
+
+    async def _hold_session(self, ready: asyncio.Future, closing: asyncio.Event):
+        """Open the session, publish it, and keep it open until aclose()."""
+        # The session may outlive any shared_http_client() block it was
+        # opened in, so it gets an HTTP client of its own
+        _shared_http.set(None)
+        try:
+            async with self._transport() as (read, write, _):
+                async with ClientSession(read, write) as session:
+                    await session.initialize()
+                    self._shared_session = session
+                    ready.set_result(None)
+                    await closing.wait()
+        except Exception as e:
+            if not ready.done():
+                ready.set_exception(e)
+                # Marks the exception as retrieved for waiters that gave up
+                ready.exception()
+            else:
+                # The session broke while in use; calls fall back to
+                # their own sessions
+                print_error(f"Session to {self.server_url} closed: {e}")
+        finally:
+            self._shared_session = None
+
+    async def aclose(self):
+        """Close the session opened by connect() (no-op if not connected)."""
+        task, self._session_task = self._session_task, None
+        if task is None:
+            return
+        self._closing.set()
+        await asyncio.gather(task, return_exceptions=True)
+
+    async def __aenter__(self) -> "MCPClient":
+        await self.connect()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.aclose()
+
+    @asynccontextmanager
+    async def shared_session(self) -> AsyncIterator[ClientSession]:
+        """
+        Keep one session open (see connect()) while the block runs.
+
+        If the client is already connected, the block just uses that
+        session and leaves it open.
+
+        Example:
+            async with client.shared_session():
+                await asyncio.gather(
+                    client.call_tool("read_file", {"path": "a.txt"}),
+                    client.call_tool("read_file", {"path": "b.txt"}),
+                )
+
+        Learning Point:
+            Every session starts with a handshake (initialize). Running a
+            batch of calls over one session pays for it once, and the
+            session can carry several requests at the same time.
+        """
+        if self._session_task is not None:
+            yield self._shared_session
+            return
+
+        await self.connect()
+        try:
+            yield self._shared_session
+        finally:
+            await self.aclose()
+
+    def _load_tools_from_disk(self) -> Optional[List[Dict[str, Any]]]:
+        """
+        Read tool schemas cached by an earlier run.
+
+        Returns:
+            The tools, or None if there is no fresh cache file
+
+        Learning Point:
+            Tool schemas rarely change, but discovering them costs a
+            connection, a protocol handshake and a list_tools() call per
+            server. A file younger than the TTL replaces all of that with
+            one small disk read. The file's mtime is its age.
+        """
+        if self._tools_cache_ttl <= 0:
+            return None
+        try:
+            if time.time() - self._tools_cache_path.stat().st_mtime >= self._tools_cache_ttl:
+                return None
+            tools = json_utils.loads(self._tools_cache_path.read_bytes())
+        except (OSError, ValueError):
+            # Missing, unreadable or corrupt: just discover again
+            return None
+        return tools if isinstance(tools, list) else None
+
+    def _save_tools_to_disk(self, tools: List[Dict[str, Any]]):
+        """
+        Write tool schemas for the next run, then trim old cache files.
+
+        The file is written under a temporary name and renamed into place,
+        so a concurrent reader never sees half a file. A cache that can't
+        be written (read-only home, full disk) is skipped silently.
+        """
+        if self._tools_cache_ttl <= 0:
+            return
+        cache_dir = self._tools_cache_path.parent
+        tmp_path = self._tools_cache_path.with_name(f"{self._tools_cache_path.name}.{os.getpid()}.tmp")
+        try:
+            cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp_path.write_bytes(json_utils.dumps_bytes(tools))
+            os.replace(tmp_path, self._tools_cache_path)
+
+            # Evict the least recently written files beyond the limit
+            files = sorted(cache_dir.glob("tools-*.json"), key=lambda path: path.stat().st_mtime)
+            for path in files[:-MAX_TOOLS_CACHE_FILES]:
+                path.unlink(missing_ok=True)
+        except OSError:
+            tmp_path.unlink(missing_ok=True)
+
     def clear_cache(self):
         """
-        Clear the cached tools.
+        Clear the cached tools, in memory and on disk.
 
         Useful when you want to force a refresh of available tools
         (e.g., after restarting a server or adding new tools dynamically).
         """
         self._tools_cache = None
+        try:
+            self._tools_cache_path.unlink(missing_ok=True)
+        except OSError:
+            pass
+
+
+class MCPHost:
+    """
+    One MCPClient per server, and the client that owns each tool.
+
+    The host is the place that knows every server: it hands out a single
+    client per URL (so each server has at most one live session), keeps
+    the tool registry, and connects or closes all sessions at once.
+
+    Attributes:
+        timeout: Timeout passed to each MCPClient
+        clients: MCPClient for each server URL
+        tool_registry: MCPClient that owns each tool name
+
+    Example:
+        host = MCPHost()
+        host.register_tool("read_file", "http://mcp-file:3333")
+        async with host:
+            result = await host.call_tool("read_file", {"path": "hello.txt"})
+
+    Learning Point:
+        This is the "host" role of the MCP architecture: an application
+        that holds connections to many servers and routes each tool call
+        to the server that provides the tool.
+    """
+
+    def __init__(self, timeout: int = 30):
+        self.timeout = timeout
+        self.clients: Dict[str, MCPClient] = {}
+        self.tool_registry: Dict[str, MCPClient] = {}
+
+    def client(self, server_url: str) -> MCPClient:
+        """Get or create the MCPClient for a server URL."""
+        client = self.clients.get(server_url)
+        if client is None:
+            client = self.clients[server_url] = MCPClient(server_url, timeout=self.timeout)
+        return client
+
+    def register_tool(self, tool_name: str, server_url: str) -> MCPClient:
+        """Route a tool to a server; returns the server's client."""
+        client = self.tool_registry[tool_name] = self.client(server_url)
+        return client
+
+    def unregister_tool(self, tool_name: str):
+        """Forget a tool (its server's client stays available)."""
+        self.tool_registry.pop(tool_name, None)
+
+    async def connect_all(self, clients: Optional[Iterable[MCPClient]] = None):
+        """
+        Open a session to every known server, all at the same time.
+
+        Args:
+            clients: Only connect these clients (default: all). Clients
+                that are already connected are left as they are.
+
+        A server that can't be reached is reported and skipped; its tools
+        still work later through one-off sessions if it comes back.
+        """
+        clients = list(self.clients.values() if clients is None else clients)
+        results = await asyncio.gather(
+            *(client.connect() for client in clients), return_exceptions=True
+        )
+        for client, result in zip(clients, results):
+            if isinstance(result, Exception):
+                cause = _network_error(result) or result
+                print_error(f"Could not connect to {client.server_url}: {cause}")
+
+    async def call_tool(self, name: str, arguments: Dict[str, Any]) -> Any:
+        """
+        Call a tool on the server that owns it.
+
+        Raises:
+            KeyError: If the tool isn't registered
+        """
+        client = self.tool_registry.get(name)
+        if client is None:
+            raise KeyError(name)
+        return await client.call_tool(name, arguments)
+
+    async def aclose(self):
+        """Close every open session."""
+        await asyncio.gather(
+            *(client.aclose() for client in self.clients.values()), return_exceptions=True
+        )
+
+    async def __aenter__(self) -> "MCPHost":
+        await self.connect_all()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.aclose()
 
 
 def mcp_to_ollama_tool(mcp_tool: Dict[str, Any]) -> Dict[str, Any]:
@@ -238,15 +732,21 @@ def mcp_to_ollama_tool(mcp_tool: Dict[str, Any]) -> Dict[str, Any]:
         "function": {
             "name": mcp_tool["name"],
             "description": mcp_tool["description"],
-            "parameters": mcp_tool.get("inputSchema", {"type": "object", "properties": {}})
+            "parameters": mcp_tool.get("inputSchema", _EMPTY_SCHEMA)
         }
     }
 
 
-async def _discover_all_tools_async() -> tuple[List[Dict[str, Any]], Dict[str, str]]:
+async def _discover_all_tools_async(
+    required_tools: Optional[Set[str]] = None
+) -> tuple[List[Dict[str, Any]], Dict[str, str]]:
     """
     Async implementation of tool discovery from all configured MCP servers.
 
+    Args:
+        required_tools: If given, stop as soon as all these tools have been
+            found and cancel the servers that haven't answered yet
+
     Returns:
         Tuple of:
         - List of tools in Ollama format
@@ -254,52 +754,85 @@ async def _discover_all_tools_async() -> tuple[List[Dict[str, Any]], Dict[str, s
     """
     config = get_config()
 
-    all_mcp_tools = []
-    server_map = {}
-
-    # Query file server
-    try:
-        file_client = MCPClient(config.mcp_file_url, timeout=30)
-        file_tools = await file_client.get_tools()
-        all_mcp_tools.extend(file_tools)
-
-        # Add to server map (use the client's adjusted URL)
-        for tool in file_tools:
-            server_map[tool["name"]] = file_client.server_url
-
-    except Exception as e:
-        print_error(f"Failed to load tools from file server: {e}")
-        # Continue anyway - maybe DB server works
-
-    # Query database server
-    try:
-        db_client = MCPClient(config.mcp_db_url, timeout=30)
-        db_tools = await db_client.get_tools()
-        all_mcp_tools.extend(db_tools)
-
-        # Add to server map (use the client's adjusted URL)
-        for tool in db_tools:
-            server_map[tool["name"]] = db_client.server_url
-
-    except Exception as e:
-        print_error(f"Failed to load tools from database server: {e}")
-        # Continue anyway
+    servers = [
+        ("file server", MCPClient(config.mcp_file_url, timeout=30)),
+        ("database server", MCPClient(config.mcp_db_url, timeout=30)),
+    ]
+
+    # Query all servers at the same time
+    # Learning Point: discovery requests are independent, so running them
+    # concurrently makes startup as slow as the slowest server, not the sum
+    # of all. A failing server is reported without hiding the others.
+    # One HTTP connection pool for all servers (see shared_http_client)
+    async with shared_http_client():
+        tasks = {
+            asyncio.create_task(client.get_tools()): index
+            for index, (_, client) in enumerate(servers)
+        }
+        pending = set(tasks)
+        results: Dict[int, List[Dict[str, Any]]] = {}
+        found = set()
 
-    # Convert to Ollama format
-    ollama_tools = [mcp_to_ollama_tool(tool) for tool in all_mcp_tools]
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+
+                for task in done:
+                    index = tasks[task]
+                    if task.exception() is not None:
+                        print_error(f"Failed to load tools from {servers[index][0]}: {task.exception()}")
+                        # Continue anyway - maybe the other servers work
+                        continue
+                    results[index] = task.result()
+                    found.update(tool["name"] for tool in results[index])
+
+                # Early exit: everything we need is already here
+                if pending and required_tools and required_tools <= found:
+                    print_info(f"All required tools found, skipping {len(pending)} server(s)")
+                    break
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+    # Assemble in server order so the tool list is the same on every run,
+    # converting to Ollama format in the same pass (same mapping as
+    # mcp_to_ollama_tool, inlined so no function call is made per tool)
+    ollama_tools = []
+    server_map = {}
+    for index, (_, client) in enumerate(servers):
+        for tool in results.get(index, []):
+            ollama_tools.append({
+                "type": "function",
+                "function": {
+                    "name": tool["name"],
+                    "description": tool["description"],
+                    "parameters": tool.get("inputSchema", _EMPTY_SCHEMA)
+                }
+            })
+            # Add to server map (use the client's adjusted URL)
+            server_map[tool["name"]] = client.server_url
 
     print_info(f"Total tools available: {len(ollama_tools)}")
 
     return ollama_tools, server_map
 
 
-def discover_all_tools() -> tuple[List[Dict[str, Any]], Dict[str, str]]:
+def discover_all_tools(
+    required_tools: Optional[Set[str]] = None
+) -> tuple[List[Dict[str, Any]], Dict[str, str]]:
     """
     Discover tools from all configured MCP servers.
 
     This is a convenience function that wraps the async implementation
     for use in synchronous code.
 
+    Args:
+        required_tools: Tool names known to be needed (e.g. the tools that
+            answered the same prompt before). Discovery returns as soon as
+            all of them are found, so the result may be partial.
+
     Returns:
         Tuple of:
         - List of tools in Ollama format
@@ -307,6 +840,8 @@ def discover_all_tools() -> tuple[List[Dict[str, Any]], Dict[str, str]]:
 
     Learning Point:
         The MCP SDK uses async/await for I/O operations, but our agent
-        is synchronous. We bridge this gap with asyncio.run().
+        is synchronous. We bridge this gap with run_sync(), which hands the
+        coroutine to the long-lived background loop instead of building and
+        tearing down a new loop on every call.
     """
-    return asyncio.run(_discover_all_tools_async())
+    return run_sync(_discover_all_tools_async(required_tools))
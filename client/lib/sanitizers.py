@@ -36,7 +36,9 @@ Real-World Example:
 
 import re
 import urllib.parse
-from typing import Dict, Any
+from typing import Callable, Dict, Any
+
+from lib import json_utils
 
 
 def clean_json_text(text: str) -> str:
@@ -181,6 +183,46 @@ def fix_sql_args(args: Dict[str, Any]) -> Dict[str, Any]:
     return args
 
 
+def _validate_read_file(args: Dict[str, Any]):
+    """Reject paths that could escape the data directory."""
+    path = args.get("path", "")
+
+    # Check for path traversal attempts
+    if ".." in path:
+        raise ValueError(
+            f"Potentially dangerous file path: {path}\n"
+            f"Path traversal (.. sequences) not allowed for security."
+        )
+
+    # Check for absolute paths (should be relative)
+    if path.startswith("/"):
+        raise ValueError(
+            f"Absolute paths not allowed: {path}\n"
+            f"Please use relative paths from the data directory."
+        )
+
+
+def _validate_query_db(args: Dict[str, Any]):
+    """Reject empty SQL."""
+    sql = args.get("sql", "")
+
+    # Basic sanity check: SQL should not be empty
+    if not sql or not sql.strip():
+        raise ValueError("SQL query cannot be empty")
+
+    # Potentially dangerous keywords (DROP, TRUNCATE, DELETE, ALTER) are
+    # not blocked - this is educational! In production, you might block
+    # them or require confirmation.
+
+
+# The checks for each tool, looked up by name. Tools without an entry
+# need no client-side validation.
+_ARGUMENT_VALIDATORS: Dict[str, Callable[[Dict[str, Any]], None]] = {
+    "read_file": _validate_read_file,
+    "query_db": _validate_query_db,
+}
+
+
 def validate_tool_arguments(tool_name: str, args: Dict[str, Any]) -> bool:
     """
     Validate that tool arguments are reasonable and safe.
@@ -202,6 +244,10 @@ def validate_tool_arguments(tool_name: str, args: Dict[str, Any]) -> bool:
         Input validation is the first line of defense against errors
         and security issues. Always validate at system boundaries!
 
+        Each tool's checks live in their own function, found with one
+        dict lookup - adding a tool means adding an entry, not another
+        elif to walk through on every call.
+
     Example:
         >>> validate_tool_arguments("read_file", {"path": "hello.txt"})
         True
@@ -209,39 +255,9 @@ def validate_tool_arguments(tool_name: str, args: Dict[str, Any]) -> bool:
         >>> validate_tool_arguments("read_file", {"path": "../../etc/passwd"})
         ValueError: Potentially dangerous file path
     """
-    if tool_name == "read_file":
-        path = args.get("path", "")
-
-        # Check for path traversal attempts
-        if ".." in path:
-            raise ValueError(
-                f"Potentially dangerous file path: {path}\n"
-                f"Path traversal (.. sequences) not allowed for security."
-            )
-
-        # Check for absolute paths (should be relative)
-        if path.startswith("/"):
-            raise ValueError(
-                f"Absolute paths not allowed: {path}\n"
-                f"Please use relative paths from the data directory."
-            )
-
-    elif tool_name == "query_db":
-        sql = args.get("sql", "")
-
-        # Basic sanity check: SQL should not be empty
-        if not sql or not sql.strip():
-            raise ValueError("SQL query cannot be empty")
-
-        # Warning for potentially dangerous SQL keywords
-        # (Not blocked, just logged - this is educational!)
-        dangerous_keywords = ["DROP", "TRUNCATE", "DELETE", "ALTER"]
-        sql_upper = sql.upper()
-        for keyword in dangerous_keywords:
-            if keyword in sql_upper:
-                # In production, you might block this or require confirmation
-                # For education, we allow it but could log a warning
-                pass
+    validator = _ARGUMENT_VALIDATORS.get(tool_name)
+    if validator is not None:
+        validator(args)
 
     return True
 
@@ -271,11 +287,12 @@ def sanitize_output(output: Any, max_length: int = 10000) -> Any:
         >>> len(result) <= 1010  # 1000 + truncation message
         True
     """
-    import json
-
-    # Convert to string representation for length checking
-    if isinstance(output, (dict, list)):
-        output_str = json.dumps(output)
+    # Convert to string representation for length checking. This runs on
+    # every tool result, so it uses the fast encoder (orjson if installed)
+    if isinstance(output, str):
+        output_str = output
+    elif isinstance(output, (dict, list)):
+        output_str = json_utils.dumps(output)
     else:
         output_str = str(output)
 
@@ -29,11 +29,15 @@ Learning Points:
 """
 
 import asyncio
-import json
-from typing import Dict, Any, List
-from lib.ui import print_tool_exec, print_error, print_success
+import queue
+import re
+import time
+from collections import OrderedDict
+from typing import Dict, Any, List, Generator, Optional, Tuple, Callable
+from lib.ui import print_tool_exec, print_error, print_success, VERBOSE
 from lib.sanitizers import fix_sql_args, validate_tool_arguments, sanitize_output
-from lib.mcp_client import MCPClient
+from lib.mcp_client import MCPClient, MCPHost, shared_http_client, background_loop, run_sync
+from lib import json_utils, toon
 
 
 class ToolRouter:
@@ -46,7 +50,14 @@ class ToolRouter:
     Attributes:
         server_map: Dict mapping tool names to server URLs
         timeout: Request timeout in seconds
-        _clients: Cache of MCPClient instances per server
+        cache_ttl: Seconds a cached read-only result stays valid
+        cache_size: Most read-only results kept (least recently used go first)
+        max_concurrent: Most tool calls of one batch running at the same time
+        max_repeated_failures: Failures of one exact call before it's no longer retried
+        failure_ttl: Seconds a failing call stays blocked after its last real failure
+        host: MCPHost holding one MCPClient per server and the tool registry
+        _result_cache: Cached results of read-only tool calls
+        _failures: Consecutive failures, last error and time of each failing call
 
     Learning Point:
         Using the SDK provides:
@@ -55,7 +66,43 @@ class ToolRouter:
         - Better error messages
     """
 
-    def __init__(self, server_map: Dict[str, str], timeout: int = 30):
+    # Tools that only read data - calling them twice with the same
+    # arguments gives the same answer, so their results can be cached.
+    # query_db is cacheable only for SELECT queries (see _is_cacheable).
+    # A cached result can be up to cache_ttl seconds old: a file edited by
+    # hand in the meantime is only seen once its entry expires.
+    CACHEABLE_TOOLS = {"read_file", "read_file_chunk", "list_files", "list_tables", "describe_table"}
+
+    # Tools that read the database. Their cached results are dropped as
+    # soon as a query_db that may write (anything but a SELECT) succeeds.
+    DATABASE_TOOLS = ("query_db", "list_tables", "describe_table")
+    _INTO_RE = re.compile(r"\bINTO\b", re.IGNORECASE)
+
+    # Tools whose arguments need fixing up before the call (LLM quirks),
+    # looked up by name
+    ARGUMENT_FIXERS: Dict[str, Callable[[Dict[str, Any]], Dict[str, Any]]] = {
+        "query_db": fix_sql_args,
+    }
+
+    # How each kind of raw result is wrapped into a dict, looked up by type.
+    # Dicts (and anything not listed) are kept as they are.
+    RESULT_WRAPPERS: Dict[type, Callable[[Any], Dict[str, Any]]] = {
+        str: lambda result: {"content": result},
+        list: lambda result: {"data": result},
+        type(None): lambda result: {"status": "success"},
+    }
+
+    def __init__(
+        self,
+        server_map: Dict[str, str],
+        timeout: int = 30,
+        cache_ttl: float = 60.0,
+        cache_size: int = 128,
+        max_concurrent: int = 8,
+        max_repeated_failures: int = 2,
+        failure_ttl: float = 30.0,
+        toon_tables: bool = False
+    ):
         """
         Initialize the tool router.
 
@@ -63,14 +110,44 @@ class ToolRouter:
             server_map: Dictionary mapping tool names to server URLs
                 Example: {"read_file": "http://mcp-file:3333/mcp", ...}
             timeout: Request timeout in seconds (default: 30)
+            cache_ttl: Seconds to keep read-only results (default: 60, 0 disables).
+                Writes made through query_db drop the database results at once;
+                changes made outside the agent show up after at most this long.
+            cache_size: Most read-only results to keep (default: 128)
+            max_concurrent: Limit on concurrent tool calls per batch (default: 8)
+            max_repeated_failures: After this many consecutive failures, the
+                same call (tool + arguments) returns its last error without
+                being run again (default: 2, 0 disables)
+            failure_ttl: Seconds after its last real failure that a call is
+                tried again anyway, e.g. once a restarted server is back
+                (default: 30). The router outlives a single question, so
+                a block must not last for the rest of the session.
+            toon_tables: Send uniform lists of records (e.g. SELECT rows)
+                to the LLM as TOON tables instead of JSON (default: False)
 
         Learning Point:
-            We cache MCPClient instances to avoid recreating them
-            for each tool call, though the SDK handles connection pooling.
+            The MCPHost keeps one MCPClient per server, so every call to
+            a server goes through the same client (and its session).
         """
         self.server_map = server_map
         self.timeout = timeout
-        self._clients: Dict[str, MCPClient] = {}
+        self.cache_ttl = cache_ttl
+        self.cache_size = cache_size
+        self.max_concurrent = max_concurrent
+        # (tool, canonical JSON args) -> (result, expiry), oldest use first
+        self._result_cache: "OrderedDict[Tuple[str, str], Tuple[Dict[str, Any], float]]" = OrderedDict()
+        self.max_repeated_failures = max_repeated_failures
+        self.failure_ttl = failure_ttl
+        # (tool, canonical JSON args) -> (consecutive failures, last error,
+        # time of the last failure)
+        self._failures: Dict[Tuple[str, str], Tuple[int, Dict[str, Any], float]] = {}
+        self.toon_tables = toon_tables
+
+        # Resolve every tool to its client once, so a tool call is a
+        # single dict lookup (kept in sync by register/unregister_tool)
+        self.host = MCPHost(timeout=timeout)
+        for name, url in server_map.items():
+            self.host.register_tool(name, url)
 
     def _get_client(self, server_url: str) -> MCPClient:
         """
@@ -82,9 +159,7 @@ class ToolRouter:
         Returns:
             MCPClient instance for the server
         """
-        if server_url not in self._clients:
-            self._clients[server_url] = MCPClient(server_url, timeout=self.timeout)
-        return self._clients[server_url]
+        return self.host.client(server_url)
 
     def route(self, tool_name: str) -> str:
         """
@@ -99,13 +174,62 @@ class ToolRouter:
         Raises:
             KeyError: If tool is not registered
         """
-        if tool_name not in self.server_map:
+        try:
+            return self.server_map[tool_name]
+        except KeyError:
             raise KeyError(
                 f"Tool '{tool_name}' not found in registry.\n"
                 f"Available tools: {', '.join(self.server_map.keys())}"
+            ) from None
+
+    def _is_cacheable(self, tool_name: str, arguments: Dict[str, Any]) -> bool:
+        """
+        Check whether a tool call only reads data (safe to cache).
+
+        Args:
+            tool_name: Name of the tool
+            arguments: Arguments passed to the tool
+
+        Returns:
+            True if the result can be served from the cache
+        """
+        if self.cache_ttl <= 0:
+            return False
+
+        if tool_name == "query_db":
+            # A single SELECT that doesn't create a table (SELECT ... INTO).
+            # A false "no" only costs a cache miss
+            sql = arguments.get("sql", "")
+            return (
+                isinstance(sql, str)
+                and sql.lstrip().upper().startswith("SELECT")
+                and ";" not in sql.rstrip().rstrip(";")
+                and self._INTO_RE.search(sql) is None
             )
 
-        return self.server_map[tool_name]
+        return tool_name in self.CACHEABLE_TOOLS
+
+    def clear_cache(self):
+        """
+        Clear cached tool results, and forget past failures.
+
+        Useful after changing data behind a read-only tool
+        (e.g., editing a file in mcp-file/data/), or after fixing
+        whatever made a call fail.
+        """
+        self._result_cache.clear()
+        self._failures.clear()
+
+    def invalidate(self, tool_name: str):
+        """
+        Drop the cached results of one tool.
+
+        Args:
+            tool_name: Tool whose results are stale (e.g. "read_file"
+                after a file changed, or any tool of a restarted server)
+        """
+        for key in [key for key in self._result_cache if key[0] == tool_name]:
+            del self._result_cache[key]
 
     async def _execute_tool_async(
         self,
@@ -123,38 +247,69 @@ class ToolRouter:
             Tool execution result
         """
         print_tool_exec(f"Calling: {tool_name}")
-        print(f"      Args: {json.dumps(arguments)}")
+        if VERBOSE:
+            print(f"      Args: {json_utils.dumps(arguments, default=str)}")
 
         try:
             # Step 1: Validate arguments (security)
             validate_tool_arguments(tool_name, arguments)
 
             # Step 2: Sanitize arguments (fix LLM quirks)
-            if tool_name == "query_db":
-                arguments = fix_sql_args(arguments)
-
-            # Step 3: Route to correct server
-            server_url = self.route(tool_name)
-
-            # Step 4: Get client and call tool
-            client = self._get_client(server_url)
+            fixer = self.ARGUMENT_FIXERS.get(tool_name)
+            if fixer is not None:
+                arguments = fixer(arguments)
+
+            # Step 3: Serve read-only calls from the cache when possible
+            # Learning Point: memoization - same question, same answer,
+            # no network round-trip. Entries expire after cache_ttl seconds,
+            # and the least recently used go first once cache_size is reached.
+            cache_key = None
+            if self._is_cacheable(tool_name, arguments):
+                cache_key = (tool_name, json_utils.dumps(arguments, sort_keys=True, default=str))
+                cached = self._result_cache.get(cache_key)
+                if cached and cached[1] > time.monotonic():
+                    self._result_cache.move_to_end(cache_key)
+                    print_success("Result served from cache")
+                    return cached[0]
+
+            # Step 4: Route to the client of the correct server
+            client = self.host.tool_registry.get(tool_name)
+            if client is None:
+                # Not precomputed (server_map edited directly) - route() raises
+                # KeyError listing the available tools if it's truly unknown
+                client = self.host.register_tool(tool_name, self.route(tool_name))
+
+            # Step 5: Call the tool
             result = await client.call_tool(tool_name, arguments)
 
-            # Step 5: Format and sanitize result
+            # Step 6: Format and sanitize result
             # Convert to dict format for consistency
-            if isinstance(result, str):
-                result = {"content": result}
-            elif isinstance(result, list):
-                result = {"data": result}
-            elif result is None:
-                result = {"status": "success"}
+            wrap = self.RESULT_WRAPPERS.get(type(result))
+            if wrap is not None:
+                result = wrap(result)
 
             result = sanitize_output(result)
 
-            # Show truncated result for logging
-            result_str = json.dumps(result)
-            truncated = result_str[:150] + "..." if len(result_str) > 150 else result_str
-            print_success(f"Result: {truncated}")
+            # Show truncated result for logging. Only the first 150 bytes
+            # are decoded (a cut multi-byte character becomes U+FFFD), and
+            # nothing is encoded at all when output is silenced.
+            if VERBOSE:
+                result_bytes = json_utils.dumps_bytes(result)
+                truncated = result_bytes[:150].decode("utf-8", errors="replace")
+                if len(result_bytes) > 150:
+                    truncated += "..."
+                print_success(f"Result: {truncated}")
+
+            if tool_name == "query_db" and cache_key is None:
+                # The statement may have changed rows or the schema
+                for name in self.DATABASE_TOOLS:
+                    self.invalidate(name)
+
+            if cache_key is not None:
+                self._result_cache[cache_key] = (result, time.monotonic() + self.cache_ttl)
+                self._result_cache.move_to_end(cache_key)
+                while len(self._result_cache) > self.cache_size:
+                    self._result_cache.popitem(last=False)
 
             return result
 
@@ -188,17 +343,166 @@ class ToolRouter:
             KeyError: If tool not found in registry
             ValueError: If tool execution fails
         """
-        return asyncio.run(self._execute_tool_async(tool_name, arguments))
+        # Open (or reuse) the server's session; if that fails the call
+        # falls back to a one-off session and reports its own error
+        client = self.host.tool_registry.get(tool_name)
+        if client is not None:
+            run_sync(self.host.connect_all([client]))
+        return run_sync(self._execute_tool_async(tool_name, arguments))
+
+    @staticmethod
+    def _normalize_arguments(raw_args: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Normalize tool arguments (handle Ollama quirks).
+
+        Sometimes Ollama wraps values in {"value": actual_value}.
+
+        Args:
+            raw_args: Arguments as sent by the LLM
+
+        Returns:
+            Arguments with any {"value": ...} wrappers removed
+        """
+        return {
+            key: value["value"] if isinstance(value, dict) and "value" in value else value
+            for key, value in raw_args.items()
+        }
+
+    async def _execute_tool_call_async(
+        self,
+        tool_call: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        Execute one LLM tool call, returning errors as results.
+
+        Args:
+            tool_call: Tool call object with function.name/function.arguments
+
+        Returns:
+            Tool execution result, or {"error": ..., "tool": ...} on failure
+            (a failing tool must not crash the whole loop)
+        """
+        func_name = tool_call["function"]["name"]
+        raw_args = tool_call["function"]["arguments"]
+
+        # Learning Point: a model that gets an error back often asks for
+        # the exact same call again, and every retry adds another error to
+        # the conversation. After a few identical failures, answer from
+        # memory: no network call, and the error says to try something else.
+        key = (func_name, json_utils.dumps(raw_args, sort_keys=True, default=str))
+        failures = self._failures.get(key)
+        if failures and time.monotonic() - failures[2] > self.failure_ttl:
+            # Long enough ago that the cause may be gone: try again
+            del self._failures[key]
+            failures = None
+        if failures and self.max_repeated_failures and failures[0] >= self.max_repeated_failures:
+            # Not counted as another failure: the call wasn't made
+            count, error, _ = failures
+            return {
+                "error": f"{error['error']}\n(Not retried: this exact call already failed {count} times. Change the arguments or use another tool.)",
+                "tool": func_name
+            }
+
+        try:
+            normalized_args = self._normalize_arguments(raw_args)
+            result = await self._execute_tool_async(func_name, normalized_args)
+        except Exception as e:
+            error = {
+                "error": str(e),
+                "tool": func_name
+            }
+            self._failures[key] = ((failures[0] if failures else 0) + 1, error, time.monotonic())
+            if len(self._failures) > 256:
+                # Bounded: forget the oldest failing call
+                self._failures.pop(next(iter(self._failures)))
+            return error
+
+        if failures:
+            # It works now (e.g. the server came back): start counting afresh
+            self._failures.pop(key, None)
+        return result
+
+    async def _run_tool_calls_async(
+        self,
+        tool_calls: List[Dict[str, Any]],
+        on_result: Callable[[int, Dict[str, Any]], None]
+    ):
+        """
+        Execute tool calls concurrently, reporting each result as it finishes.
+
+        Every server gets one MCP session, opened by the first batch that
+        needs it and reused by every later batch, so a tool call costs no
+        handshake at all once the session is up. At most max_concurrent
+        calls run at the same time; the rest wait for a free slot.
+
+        Args:
+            tool_calls: List of tool call objects
+            on_result: Called with (index into tool_calls, result)
+        """
+        clients = {
+            self.host.tool_registry[name]
+            for name in (tool_call["function"]["name"] for tool_call in tool_calls)
+            if name in self.host.tool_registry
+        }
+
+        # Bounds the load one LLM response can put on the servers
+        semaphore = asyncio.Semaphore(self.max_concurrent)
+
+        async def run(index: int, tool_call: Dict[str, Any]):
+            async with semaphore:
+                result = await self._execute_tool_call_async(tool_call)
+            on_result(index, result)
+
+        # Sessions stay open after the batch, for the next one (see close()).
+        # Calls to a server that can't be connected fall back to their own
+        # sessions, which share one HTTP pool, and report their errors.
+        await self.host.connect_all(clients)
+        async with shared_http_client():
+            await asyncio.gather(
+                *(run(index, tool_call) for index, tool_call in enumerate(tool_calls))
+            )
+
+    async def execute_tools_async(
+        self,
+        tool_calls: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Execute multiple tool calls concurrently.
+
+        Args:
+            tool_calls: List of tool call objects, each containing:
+                - function.name: Tool name
+                - function.arguments: Tool arguments
+
+        Returns:
+            List of results in same order as tool_calls
+
+        Learning Point:
+            Tool calls are independent network requests, so waiting for
+            them one after another wastes time. Running them concurrently
+            makes the total time the slowest call, not the sum.
+
+            A semaphore caps how many run at once: a model that asks for
+            fifty reads shouldn't open fifty requests to one server.
+        """
+        results: List[Dict[str, Any]] = [None] * len(tool_calls)
+
+        def store(index: int, result: Dict[str, Any]):
+            results[index] = result
+
+        await self._run_tool_calls_async(tool_calls, store)
+        return results
 
     def execute_tools(
         self,
         tool_calls: List[Dict[str, Any]]
     ) -> List[Dict[str, Any]]:
         """
-        Execute multiple tool calls sequentially.
+        Execute multiple tool calls concurrently.
 
         This handles the case where the LLM requests multiple tools
-        in a single response. Tools are executed in order.
+        in a single response. All tools run on the background event loop
+        (see run_sync), where the servers' sessions stay open.
 
         Args:
             tool_calls: List of tool call objects, each containing:
@@ -207,40 +511,52 @@ class ToolRouter:
 
         Returns:
             List of results in same order as tool_calls
+        """
+        return run_sync(self.execute_tools_async(tool_calls))
 
-        Learning Point:
-            Sequential execution is simple but can be slow.
-            In production, you might execute tools in parallel
-            using asyncio.gather().
-        """
-        results = []
-
-        for tool_call in tool_calls:
-            func_name = tool_call["function"]["name"]
-            raw_args = tool_call["function"]["arguments"]
-
-            # Normalize arguments (handle Ollama quirks)
-            # Sometimes Ollama wraps values in {"value": actual_value}
-            normalized_args = {}
-            for key, value in raw_args.items():
-                if isinstance(value, dict) and "value" in value:
-                    normalized_args[key] = value["value"]
-                else:
-                    normalized_args[key] = value
-
-            # Execute tool
-            try:
-                result = self.execute_tool(func_name, normalized_args)
-                results.append(result)
-            except Exception as e:
-                # Return error as a result (don't crash the whole loop)
-                error_result = {
-                    "error": str(e),
-                    "tool": func_name
-                }
-                results.append(error_result)
+    def iter_tool_results(
+        self,
+        tool_calls: List[Dict[str, Any]]
+    ) -> Generator[Tuple[int, Dict[str, Any]], None, None]:
+        """
+        Execute tool calls concurrently, yielding results as they finish.
 
-        return results
+        Unlike execute_tools(), results arrive in completion order, so a
+        GUI can show each one as soon as it is ready.
+
+        Args:
+            tool_calls: List of tool call objects
+
+        Yields:
+            Tuples of (index into tool_calls, result)
+
+        Example:
+            results = [None] * len(tool_calls)
+            for index, result in router.iter_tool_results(tool_calls):
+                results[index] = result
+        """
+        # The calls run on the background loop; results come back to this
+        # thread through a thread-safe queue. None means "runner finished".
+        results: "queue.Queue[Optional[Tuple[int, Dict[str, Any]]]]" = queue.Queue()
+        runner = asyncio.run_coroutine_threadsafe(
+            self._run_tool_calls_async(tool_calls, lambda index, result: results.put((index, result))),
+            background_loop()
+        )
+        runner.add_done_callback(lambda _: results.put(None))
+
+        try:
+            for _ in range(len(tool_calls)):
+                item = results.get()
+                if item is None:
+                    # The runner stopped without producing every result
+                    runner.result()
+                    return
+                yield item
+            runner.result()
+        finally:
+            # The consumer may stop early: don't leave the calls running
+            if not runner.done():
+                runner.cancel()
 
     def format_tool_results_for_llm(
         self,
@@ -257,20 +573,88 @@ class ToolRouter:
 
         Returns:
             List of message objects with role="tool"
+
+        Learning Point:
+            Every character sent back is prompt the LLM has to read.
+            Plain text (e.g. a file's content) is passed as it is:
+            JSON-encoding it would only add quotes and turn every newline
+            and quote into an escape sequence. Anything structured
+            (lists, errors, ...) is sent as JSON - or, with toon_tables,
+            as a TOON table when it's a uniform list of records.
+        """
+        return [{"role": "tool", "content": self._result_text(result)} for result in results]
+
+    def _result_text(self, result: Any) -> str:
+        """The text of one tool result, as the LLM should see it."""
+        if isinstance(result, str):
+            return result
+        if isinstance(result, (bytes, bytearray)):
+            return result.decode("utf-8", errors="replace")
+        if isinstance(result, dict) and len(result) == 1:
+            # A text result wrapped by _execute_tool_async: {"content": "..."}
+            content = result.get("content")
+            if isinstance(content, str):
+                if self.toon_tables:
+                    table = self._toon_text(content)
+                    if table is not None:
+                        return table
+                return content
+            # Rows wrapped by _execute_tool_async: {"data": [...]}
+            data = result.get("data")
+            if self.toon_tables and isinstance(data, list):
+                table = toon.encode_table(data)
+                if table is not None:
+                    return table
+        # json_utils uses orjson when it's installed
+        return json_utils.dumps(result)
+
+    @staticmethod
+    def _toon_text(text: str) -> Optional[str]:
+        """
+        A JSON text result as a TOON table, or None if it isn't tabular.
+
+        FastMCP sends a tool's list or dict return value as one JSON text
+        item (e.g. query_db's {"rows": [...], "truncated": false}), so
+        this is where tabular results arrive.
+        """
+        # Only JSON can be a table: plain text isn't parsed at all
+        if not text.startswith(("[", "{")):
+            return None
+        try:
+            value = json_utils.loads(text)
+        except ValueError:
+            return None
+        return toon.encode_result(value)
+
+    def connect(self):
         """
-        messages = []
+        Open a session to every server now, instead of on first use.
 
-        for result in results:
-            # Convert result to string (JSON format)
-            content_str = json.dumps(result)
+        Sessions are otherwise opened by the first call that needs them;
+        connecting up front moves the handshakes out of the first
+        question. Servers that can't be reached are reported and skipped.
+        """
+        run_sync(self.host.connect_all())
+
+    def close(self):
+        """
+        Close the servers' sessions.
+
+        Sessions are kept open between calls; call this when the router
+        is no longer needed. It can still be used afterwards (sessions
+        are reopened on demand).
+
+        Example:
+            with ToolRouter(server_map) as router:   # closed on exit
+                results = router.execute_tools(tool_calls)
+        """
+        run_sync(self.host.aclose())
 
-            # Create tool result message
-            messages.append({
-                "role": "tool",
-                "content": content_str
-            })
+    def __enter__(self) -> "ToolRouter":
+        return self
 
-        return messages
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
 
     def register_tool(self, tool_name: str, server_url: str):
         """
@@ -281,6 +665,7 @@ class ToolRouter:
             server_url: URL of the server that hosts this tool
         """
         self.server_map[tool_name] = server_url
+        self.host.register_tool(tool_name, server_url)
         print_success(f"Registered tool '{tool_name}' at {server_url}")
 
     def unregister_tool(self, tool_name: str):
@@ -292,6 +677,7 @@ class ToolRouter:
         """
         if tool_name in self.server_map:
             del self.server_map[tool_name]
+            self.host.unregister_tool(tool_name)
             print_success(f"Unregistered tool '{tool_name}'")
         else:
             print_error(f"Tool '{tool_name}' not found in registry")
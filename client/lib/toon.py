@@ -0,0 +1,168 @@
+"""
+TOON - Compact Tables for Tool Results
+======================================
+
+This module encodes uniform lists of records (e.g. the rows of a SELECT)
+in TOON ("Token-Oriented Object Notation") instead of JSON.
+
+Why this exists:
+- Every tool result is pasted into the LLM conversation, and every
+  character of it is prompt the model has to read
+- JSON repeats every key in every row: 50 users cost 50 copies of
+  "id", "username" and "email"
+- TOON writes the keys once, as a header, then one line of values per
+  row - typically 40-60% fewer tokens for tabular data
+
+Key Concepts:
+- **Tabular array**: `name[N]{key1,key2}:` followed by N indented rows
+  of comma-separated values
+- **Quoting**: strings are bare unless they could be misread (they
+  contain a comma, a quote, look like a number, ...)
+
+Learning Points:
+- Only uniform data gets this format: every row an object with the same
+  keys and plain values. Anything else stays JSON, so nothing is lost
+- Token count drives both latency and cost of an LLM call, so shrinking
+  what we send back is an optimization of the whole agent loop
+
+Example:
+    >>> encode_table([{"id": 1, "name": "alice"}, {"id": 2, "name": "bob"}])
+    'data[2]{id,name}:\\n  1,alice\\n  2,bob'
+"""
+
+import re
+from typing import Any, Dict, List, Optional
+
+from lib import json_utils
+
+# Strings that would read as a number if written bare
+_NUMBER_RE = re.compile(r"-?\d+(?:\.\d+)?(?:[eE][+-]?\d+)?")
+
+# Characters that force a string to be quoted
+_SPECIAL_CHARS = set(',:"\\[]{}\n\r\t')
+
+_ESCAPES = str.maketrans({"\\": "\\\\", '"': '\\"', "\n": "\\n", "\r": "\\r", "\t": "\\t"})
+
+
+def _encode_value(value: Any) -> str:
+    """Encode one primitive value (str, number, bool, None)."""
+    if value is None:
+        return "null"
+    if value is True:
+        return "true"
+    if value is False:
+        return "false"
+    if isinstance(value, int):
+        # str(), not JSON: orjson refuses integers beyond 64 bits
+        return str(value)
+    if isinstance(value, float):
+        return json_utils.dumps(value)
+
+    if (
+        not value
+        or value != value.strip()
+        or value in ("true", "false", "null")
+        or value.startswith("-")
+        or _NUMBER_RE.fullmatch(value)
+        or not _SPECIAL_CHARS.isdisjoint(value)
+    ):
+        return f'"{value.translate(_ESCAPES)}"'
+    return value
+
+
+def _as_record(row: Any) -> Optional[Dict[str, Any]]:
+    """
+    A row as a dict. A server that returns each row as its own text item
+    reaches the router as a list of JSON strings, one per row.
+    """
+    if isinstance(row, dict):
+        return row
+    if isinstance(row, str) and row.startswith("{"):
+        try:
+            record = json_utils.loads(row)
+        except ValueError:
+            return None
+        return record if isinstance(record, dict) else None
+    return None
+
+
+def encode_table(rows: List[Any], name: str = "data") -> Optional[str]:
+    """
+    Encode a list of records as a TOON tabular array.
+
+    Args:
+        rows: Records as dicts (or JSON strings of dicts)
+        name: Label written before the header
+
+    Returns:
+        The TOON text, or None if the rows aren't uniform (different keys,
+        nested values, not records at all) and should stay JSON
+    """
+    if not rows:
+        return None
+
+    records = []
+    for row in rows:
+        record = _as_record(row)
+        if record is None:
+            return None
+        records.append(record)
+
+    keys = list(records[0])
+    if not keys:
+        return None
+    key_set = set(keys)
+
+    lines = [f"{name}[{len(records)}]{{{','.join(_encode_value(key) for key in keys)}}}:"]
+    for record in records:
+        if record.keys() != key_set:
+            return None
+        values = []
+        for key in keys:
+            value = record[key]
+            if not isinstance(value, (str, int, float, bool, type(None))):
+                # Nested objects/lists don't fit in a table cell
+                return None
+            values.append(_encode_value(value))
+        lines.append("  " + ",".join(values))
+
+    return "\n".join(lines)
+
+
+# Keys that can be written bare as a table name
+_NAME_RE = re.compile(r"[A-Za-z_]\w*")
+
+
+def encode_result(value: Any) -> Optional[str]:
+    """
+    Encode a decoded tool result as TOON, if it is tabular.
+
+    Accepts a list of records, or an object holding exactly one list of
+    records next to plain values - query_db's {"rows": [...],
+    "truncated": false} becomes a "rows[N]{...}:" table followed by a
+    "truncated: false" line.
+
+    Returns:
+        The TOON text, or None if the result should stay JSON
+    """
+    if isinstance(value, list):
+        return encode_table(value)
+    if not isinstance(value, dict):
+        return None
+
+    list_keys = [key for key, item in value.items() if isinstance(item, list)]
+    if len(list_keys) != 1 or not _NAME_RE.fullmatch(list_keys[0]):
+        return None
+
+    lines = []
+    for key, item in value.items():
+        if key == list_keys[0]:
+            table = encode_table(item, name=key)
+            if table is None:
+                return None
+            lines.append(table)
+        elif isinstance(item, (str, int, float, bool, type(None))):
+            lines.append(f"{_encode_value(key)}: {_encode_value(item)}")
+        else:
+            return None
+    return "\n".join(lines)
@@ -27,6 +27,18 @@ Example:
     print_success("Found 5 tools")
 """
 
+import io
+import os
+import sys
+import threading
+from typing import Optional, TextIO
+
+
+# Progress chatter (print_info / print_success) can be switched off with
+# MCP_LAB_VERBOSE=0, e.g. for batch runs. Steps, errors, warnings and LLM
+# decisions are always shown.
+VERBOSE = os.environ.get("MCP_LAB_VERBOSE", "1") != "0"
+
 
 class Colors:
     """
@@ -48,6 +60,42 @@ class Colors:
     BOLD = '\033[1m'      # Bold text
 
 
+def _use_color() -> bool:
+    """
+    Decide once whether output gets colour codes.
+
+    Colour is off when stdout isn't a terminal (a pipe, a log file,
+    `docker logs`) or NO_COLOR is set (https://no-color.org): there the
+    codes are just extra bytes every reader has to strip. FORCE_COLOR
+    turns it back on, e.g. for a terminal behind a pipe.
+    """
+    if os.environ.get("FORCE_COLOR"):
+        return True
+    if os.environ.get("NO_COLOR"):
+        return False
+    stdout = sys.stdout
+    return stdout is not None and hasattr(stdout, "isatty") and stdout.isatty()
+
+
+if not _use_color():
+    # Every code becomes "", so all the output below (and in agent.py
+    # and setup_wizard.py) is plain text without any other change
+    for _name in ("HEADER", "OKBLUE", "OKCYAN", "OKGREEN", "WARNING", "FAIL", "ENDC", "BOLD"):
+        setattr(Colors, _name, "")
+
+
+# The constant start of each kind of line, colour code included, built
+# once here instead of on every call. Each line is still printed as one
+# string: print() writes every argument (and separator) separately.
+_STEP_PREFIX = f"\n{Colors.HEADER}{Colors.BOLD}➤ STEP "
+_INFO_PREFIX = f"{Colors.OKBLUE}  ℹ "
+_SUCCESS_PREFIX = f"{Colors.OKGREEN}  ✓ "
+_THOUGHT_PREFIX = f"{Colors.OKCYAN}  🧠 "
+_TOOL_PREFIX = f"{Colors.WARNING}  🛠️  "
+_ERROR_PREFIX = f"{Colors.FAIL}  ❌ "
+_END = Colors.ENDC
+
+
 def print_step(step_num: int, title: str):
     """
     Print a numbered step header in the agent loop.
@@ -67,7 +115,11 @@ def print_step(step_num: int, title: str):
         Visual feedback is crucial for educational tools. Users need to see
         what's happening at each stage to understand the agent loop.
     """
-    print(f"\n{Colors.HEADER}{Colors.BOLD}➤ STEP {step_num}: {title}{Colors.ENDC}")
+    print(f"{_STEP_PREFIX}{step_num}: {title}{_END}")
+
+    # A new step is a natural point to show everything printed so far
+    if ConsoleBuffer.active is not None:
+        ConsoleBuffer.active.flush()
 
 
 def print_info(msg: str):
@@ -84,7 +136,8 @@ def print_info(msg: str):
         print_info("Loading configuration from .env file")
         # Output: "ℹ Loading configuration..." (in blue)
     """
-    print(f"{Colors.OKBLUE}  ℹ {msg}{Colors.ENDC}")
+    if VERBOSE:
+        print(f"{_INFO_PREFIX}{msg}{_END}")
 
 
 def print_success(msg: str):
@@ -103,8 +156,13 @@ def print_success(msg: str):
     Learning Point:
         Positive reinforcement through visual feedback helps users feel
         confident that things are working correctly.
+
+        Set MCP_LAB_VERBOSE=0 to silence these (and print_info) when the
+        output isn't being watched: formatting and writing every line
+        costs time in long batch runs.
     """
-    print(f"{Colors.OKGREEN}  ✓ {msg}{Colors.ENDC}")
+    if VERBOSE:
+        print(f"{_SUCCESS_PREFIX}{msg}{_END}")
 
 
 def print_llm_thought(msg: str):
@@ -124,7 +182,7 @@ def print_llm_thought(msg: str):
         Making AI reasoning visible demystifies how agents work. Users can
         see the decision-making process, not just the final result.
     """
-    print(f"{Colors.OKCYAN}  🧠 {msg}{Colors.ENDC}")
+    print(f"{_THOUGHT_PREFIX}{msg}{_END}")
 
 
 def print_tool_exec(msg: str):
@@ -144,7 +202,7 @@ def print_tool_exec(msg: str):
         Tool execution is a critical step in the agent loop. Highlighting it
         helps users understand when the agent is taking action in the real world.
     """
-    print(f"{Colors.WARNING}  🛠️  {msg}{Colors.ENDC}")
+    print(f"{_TOOL_PREFIX}{msg}{_END}")
 
 
 def print_error(msg: str):
@@ -164,4 +222,107 @@ def print_error(msg: str):
         Clear error messages are essential for learning. Users need to know
         not just that something failed, but what went wrong and how to fix it.
     """
-    print(f"{Colors.FAIL}  ❌ {msg}{Colors.ENDC}")
+    print(f"{_ERROR_PREFIX}{msg}{_END}")
+
+
+class ConsoleBuffer:
+    """
+    Collect the agent's console output in memory and write it out in batches.
+
+    While active, what the entering thread prints (by the print_* helpers
+    or plain print()) goes to an in-memory buffer. The buffer is written
+    to the real stdout with a single write + flush at every step header
+    (print_step), at most FLUSH_INTERVAL seconds after the first line
+    waiting in it, and when the context manager exits. Output of other
+    threads is written straight through (after anything still buffered,
+    so lines stay in order).
+
+    Example:
+        with ConsoleBuffer():
+            chat("Who wrote the groceries note?")
+
+    Learning Point:
+        Each write to a terminal is a system call, and over SSH or
+        `docker logs` every flush can take milliseconds. Batching output
+        keeps the agent loop from waiting on the terminal. The timer
+        makes sure a line printed just before a long wait (e.g. "Sending
+        request to Ollama...") still shows up while the agent waits.
+    """
+
+    # The buffer currently capturing output (used by print_step)
+    active: Optional["ConsoleBuffer"] = None
+
+    # Longest a buffered line waits before it is written out, in seconds
+    FLUSH_INTERVAL = 0.1
+
+    def __init__(self, stream: Optional[TextIO] = None):
+        """
+        Args:
+            stream: Where to write buffered output (default: sys.stdout
+                at the time the context is entered)
+        """
+        self._stream = stream
+        self._buffer = io.StringIO()
+        self._saved_stdout: Optional[TextIO] = None
+        self._saved_active: Optional["ConsoleBuffer"] = None
+        self._owner: Optional[int] = None
+        # Guards the buffer and the stream: the timer flushes from its own thread
+        self._lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+
+    def __enter__(self) -> "ConsoleBuffer":
+        self._saved_stdout = sys.stdout
+        if self._stream is None:
+            self._stream = sys.stdout
+        # We flush explicitly, so line buffering would only add syscalls
+        if hasattr(self._stream, "reconfigure"):
+            self._stream.reconfigure(line_buffering=False)
+
+        self._owner = threading.get_ident()
+        self._saved_active = ConsoleBuffer.active
+        ConsoleBuffer.active = self
+        sys.stdout = self
+        return self
+
+    def write(self, text: str) -> int:
+        """Buffer the owning thread's output; write other threads' through."""
+        with self._lock:
+            if threading.get_ident() != self._owner:
+                self._write_out()
+                self._stream.write(text)
+                self._stream.flush()
+                return len(text)
+
+            self._buffer.write(text)
+            if self._timer is None:
+                self._timer = threading.Timer(self.FLUSH_INTERVAL, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+        return len(text)
+
+    def flush(self):
+        """Write everything buffered so far in one go."""
+        with self._lock:
+            self._write_out()
+
+    def _write_out(self):
+        """flush() with the lock already held."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        text = self._buffer.getvalue()
+        if text:
+            self._stream.write(text)
+            self._stream.flush()
+            self._buffer.seek(0)
+            self._buffer.truncate()
+
+    def __getattr__(self, name: str):
+        # Anything else (encoding, isatty, fileno...) is the real stream's
+        return getattr(self._stream, name)
+
+    def __exit__(self, exc_type, exc_value, traceback) -> bool:
+        sys.stdout = self._saved_stdout
+        ConsoleBuffer.active = self._saved_active
+        self.flush()
+        return False
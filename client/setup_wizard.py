@@ -8,9 +8,7 @@ Educational tool to guide users through the setup process.
 
 import os
 import sys
-import subprocess
-import time
-import re
+from urllib.parse import urlsplit
 from typing import Optional, Tuple
 
 # Import our UI module for consistent styling
@@ -28,35 +26,49 @@ def print_header(text: str):
 def print_box(text: str):
     """Print text in a box."""
     lines = text.strip().split('\n')
-    max_len = max(len(line) for line in lines)
-    print(f"\n{Colors.OKCYAN}┌─{'─' * max_len}─┐{Colors.ENDC}")
-    for line in lines:
-        padding = ' ' * (max_len - len(line))
-        print(f"{Colors.OKCYAN}│ {line}{padding} │{Colors.ENDC}")
-    print(f"{Colors.OKCYAN}└─{'─' * max_len}─┘{Colors.ENDC}\n")
+    max_len = max(map(len, lines))
+    # Build the whole box, then print it with a single write
+    box = [f"\n{Colors.OKCYAN}┌─{'─' * max_len}─┐{Colors.ENDC}"]
+    box.extend(f"{Colors.OKCYAN}│ {line.ljust(max_len)} │{Colors.ENDC}" for line in lines)
+    box.append(f"{Colors.OKCYAN}└─{'─' * max_len}─┘{Colors.ENDC}\n")
+    print("\n".join(box))
 
 
-def run_command(cmd: str, check: bool = True, capture: bool = True) -> Tuple[int, str]:
-    """Run a shell command."""
+def is_ollama_url(url: str) -> bool:
+    """
+    Check that url is an http(s) URL with a host.
+
+    Learning Point: urlsplit() knows URL syntax a hand-written pattern
+    misses, e.g. IPv6 hosts in brackets (http://[::1]:11434).
+    """
     try:
-        if capture:
-            result = subprocess.run(
-                cmd,
-                shell=True,
-                check=check,
-                capture_output=True,
-                text=True
-            )
-            return result.returncode, result.stdout + result.stderr
-        else:
-            result = subprocess.run(cmd, shell=True, check=check)
-            return result.returncode, ""
-    except subprocess.CalledProcessError as e:
-        return e.returncode, str(e)
-
-
-def ask_yes_no(question: str, default: bool = True) -> bool:
+        parts = urlsplit(url)
+        parts.port  # raises ValueError for a port that isn't a number <= 65535
+    except ValueError:
+        return False
+    return parts.scheme in ("http", "https") and bool(parts.hostname)
+
+
+# Without a terminal (CI, a scripted `docker compose run -T`) nobody can
+# answer a prompt: questions are answered from MCP_SETUP_* variables, or
+# take their default, instead of blocking on input()
+INTERACTIVE = sys.stdin.isatty()
+
+
+def _batch_answer(question: str, env_key: Optional[str], default: str) -> str:
+    """Answer a question without prompting (non-interactive runs)."""
+    answer = os.environ.get(env_key, "").strip() if env_key else ""
+    answer = answer or default
+    print(f"{question} {answer}")
+    return answer
+
+
+def ask_yes_no(question: str, default: bool = True, env_key: Optional[str] = None) -> bool:
     """Ask a yes/no question."""
+    if not INTERACTIVE:
+        answer = _batch_answer(question, env_key, "yes" if default else "no")
+        return answer.lower() in ('y', 'yes', '1', 'true')
+
     default_str = "Y/n" if default else "y/N"
     while True:
         answer = input(f"{question} [{default_str}]: ").strip().lower()
@@ -66,8 +78,23 @@ def ask_yes_no(question: str, default: bool = True) -> bool:
         print_error("Please answer 'yes' or 'no'")
 
 
-def ask_choice(question: str, choices: list, default: int = 0) -> int:
-    """Ask user to choose from a list."""
+def ask_choice(question: str, choices: list, default: int = 0, env_key: Optional[str] = None) -> int:
+    """
+    Ask user to choose from a list.
+
+    Without a terminal, the answer comes from env_key: a choice number, or
+    text found in one choice (e.g. "external", "llama3.2:7b").
+    """
+    if not INTERACTIVE:
+        answer = _batch_answer(question, env_key, str(default + 1))
+        if answer.isdigit() and 1 <= int(answer) <= len(choices):
+            return int(answer) - 1
+        for i, choice in enumerate(choices):
+            if answer.lower() in choice.lower():
+                return i
+        print_error(f"{env_key}={answer!r} matches none of: {', '.join(choices)}")
+        sys.exit(1)
+
     print(f"\n{question}")
     for i, choice in enumerate(choices, 1):
         marker = "→" if i == default + 1 else " "
@@ -118,7 +145,8 @@ Ollama is the {Colors.BOLD}"brain"{Colors.ENDC} - the LLM that powers the agent.
             "Local Container (Managed by Docker Compose)",
             "External Instance (Running on host)"
         ],
-        default=0
+        default=0,
+        env_key="MCP_SETUP_OLLAMA_MODE"
     )
 
     if choice == 0:
@@ -128,9 +156,20 @@ Ollama is the {Colors.BOLD}"brain"{Colors.ENDC} - the LLM that powers the agent.
         print("\nPlease enter your Ollama URL:")
         print(f"  {Colors.WARNING}Tip:{Colors.ENDC} Usually it's {Colors.BOLD}http://localhost:11434{Colors.ENDC}")
         
-        ollama_url = input(f"\nOllama URL [http://localhost:11434]: ").strip()
-        if not ollama_url:
-            ollama_url = "http://localhost:11434"
+        while True:
+            if INTERACTIVE:
+                ollama_url = input(f"\nOllama URL [http://localhost:11434]: ").strip()
+            else:
+                ollama_url = _batch_answer("Ollama URL:", "MCP_SETUP_OLLAMA_URL", "http://localhost:11434")
+            if not ollama_url:
+                ollama_url = "http://localhost:11434"
+            if is_ollama_url(ollama_url):
+                break
+            if not INTERACTIVE:
+                # Asking again would get the same answer
+                print_error(f"MCP_SETUP_OLLAMA_URL={ollama_url!r} is not an http(s) URL")
+                sys.exit(1)
+            print_error("Please enter a URL like http://host:11434 (http:// or https://)")
         print_success(f"Selected: {ollama_url}")
 
     # Model selection
@@ -140,7 +179,8 @@ Ollama is the {Colors.BOLD}"brain"{Colors.ENDC} - the LLM that powers the agent.
     model_choice = ask_choice(
         "Select a model:",
         ["llama3.2:3b", "llama3.2:7b"],
-        default=0
+        default=0,
+        env_key="MCP_SETUP_MODEL"
     )
     model_name = "llama3.2:3b" if model_choice == 0 else "llama3.2:7b"
     print_success(f"Selected model: {model_name}")
@@ -156,7 +196,8 @@ def generate_env_file(ollama_url: str, model_name: str) -> bool:
     env_path = "/workspace/.env"
     
     if os.path.exists(env_path):
-        if not ask_yes_no(f"\n.env file already exists. Overwrite?", default=False):
+        if not ask_yes_no(f"\n.env file already exists. Overwrite?", default=False,
+                          env_key="MCP_SETUP_OVERWRITE_ENV"):
             print_info("Keeping existing .env file")
             return True
 
@@ -0,0 +1,83 @@
+"""
+Unit tests for MCPAgent's remembered per-prompt tool lists.
+
+Discovery, the LLM and the tool router are replaced with fakes.
+
+Run from the client directory:
+    python -m unittest discover -s tests
+"""
+
+import os
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agent import MCPAgent, EventType  # noqa: E402
+
+SERVERS = {"read_file": "http://file/mcp", "query_db": "http://db/mcp"}
+
+
+def fake_discovery(required_tools=None):
+    """Stop at the required tools, like discover_all_tools does."""
+    names = SERVERS if required_tools is None else required_tools
+    server_map = {name: SERVERS[name] for name in names}
+    return [{"function": {"name": name}} for name in server_map], server_map
+
+
+def tool_call(name):
+    return {"message": {"content": "", "tool_calls": [
+        {"function": {"name": name, "arguments": {}}}
+    ]}}
+
+
+class FakeRouter:
+    def iter_tool_results(self, tool_calls):
+        for index, _ in enumerate(tool_calls):
+            yield index, {"content": "ok"}
+
+    def format_tool_results_for_llm(self, results):
+        return [{"role": "tool", "content": r["content"]} for r in results]
+
+
+class PromptToolsTest(unittest.TestCase):
+
+    def setUp(self):
+        patcher = mock.patch("lib.mcp_client.discover_all_tools", side_effect=fake_discovery)
+        self.discover = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def make_agent(self, replies):
+        agent = MCPAgent()
+        self.addCleanup(agent.llm_client.close)
+        agent.llm_client.chat = mock.Mock(side_effect=replies)
+        agent.llm_client.chat_stream = mock.Mock(
+            return_value=iter([{"message": {"content": "answer"}}])
+        )
+        agent._get_router = FakeRouter
+        return agent
+
+    def test_remembered_tools_are_per_agent(self):
+        first = self.make_agent([tool_call("read_file")])
+        list(first.run("read hello.txt"))
+        self.assertEqual(first._prompt_tools, {"read hello.txt": {"read_file"}})
+        self.assertEqual(self.make_agent([])._prompt_tools, {})
+
+    def test_unknown_tool_loads_every_tool_and_asks_again(self):
+        agent = self.make_agent([tool_call("query_db"), tool_call("query_db")])
+        agent._prompt_tools["who wrote it?"] = frozenset({"read_file"})
+
+        events = list(agent.run("who wrote it?"))
+
+        self.assertEqual(self.discover.call_args_list, [
+            mock.call(required_tools={"read_file"}), mock.call(required_tools=None)
+        ])
+        self.assertEqual(agent.llm_client.chat.call_count, 2)
+        self.assertEqual(set(agent.server_map), set(SERVERS))
+        self.assertEqual(events[-1].type, EventType.FINAL_ANSWER)
+        self.assertEqual(agent._prompt_tools["who wrote it?"], {"query_db"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+"""
+Unit tests for lib.json_utils, with orjson and with the stdlib fallback.
+
+Run from the client directory:
+    python -m unittest discover -s tests
+"""
+
+import os
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lib import json_utils  # noqa: E402
+
+DOCUMENT = {
+    "name": "héllo \"world\"\n",
+    "nested": {"list": [1, 2.5, None, True, False, []], "empty": {}},
+    "rows": [{"id": 1, "title": "a,b:c"}],
+}
+
+
+class JsonUtilsTest(unittest.TestCase):
+    """Runs against orjson when it's installed."""
+
+    def test_round_trip(self):
+        for encoded in (json_utils.dumps(DOCUMENT), json_utils.dumps_bytes(DOCUMENT),
+                        json_utils.dumps_pretty(DOCUMENT)):
+            with self.subTest(kind=type(encoded).__name__):
+                self.assertEqual(json_utils.loads(encoded), DOCUMENT)
+        self.assertEqual(json_utils.loads(bytearray(b"[1]")), [1])
+
+    def test_output_is_compact_utf8(self):
+        self.assertEqual(json_utils.dumps({"a": [1, "é"]}), '{"a":[1,"é"]}')
+        self.assertEqual(json_utils.dumps_bytes("é"), '"é"'.encode("utf-8"))
+
+    def test_sort_keys(self):
+        self.assertEqual(json_utils.dumps({"b": 1, "a": {"d": 2, "c": 3}}, sort_keys=True),
+                         '{"a":{"c":3,"d":2},"b":1}')
+
+    def test_default_and_non_string_keys(self):
+        self.assertEqual(json_utils.dumps({1: {1, 2} - {2}}, default=list), '{"1":[1]}')
+        with self.assertRaises(TypeError):
+            json_utils.dumps(object())
+
+    def test_invalid_json_is_a_value_error(self):
+        for text in ("", "{", "[1,]", "nope"):
+            with self.subTest(text=text):
+                with self.assertRaises(ValueError):
+                    json_utils.loads(text)
+
+
+class StdlibJsonUtilsTest(JsonUtilsTest):
+    """The same tests without orjson."""
+
+    def setUp(self):
+        patcher = mock.patch.object(json_utils, "orjson", None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,150 @@
+"""
+Unit tests for LLMClient (history compaction, the response cache) and
+its CircuitBreaker.
+
+Run from the client directory:
+    python -m unittest discover -s tests
+"""
+
+import os
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lib.config import get_config  # noqa: E402
+from lib.llm_client import CircuitBreaker, LLMClient  # noqa: E402
+
+
+def tool_turn(name, results):
+    """An assistant message calling `name` once per result, then the results."""
+    calls = [{"function": {"name": name, "arguments": {}}} for _ in results]
+    return [{"role": "assistant", "content": "", "tool_calls": calls}] + [
+        {"role": "tool", "content": content} for content in results
+    ]
+
+
+def is_summary(message):
+    return message["content"].startswith("[summary:")
+
+
+class CompactMessagesTest(unittest.TestCase):
+
+    def setUp(self):
+        self.client = LLMClient(max_context_tokens=1000, keep_last_messages=2)
+
+    def tearDown(self):
+        self.client.close()
+
+    def test_small_history_is_returned_as_is(self):
+        messages = [{"role": "user", "content": "hi"}]
+        self.assertIs(self.client.compact_messages(messages), messages)
+
+    def test_current_turn_is_never_summarized(self):
+        # One turn whose results alone exceed the budget, and reach past
+        # keep_last_messages: the model hasn't seen any of them yet
+        messages = [{"role": "system", "content": "sys"},
+                    {"role": "user", "content": "read them all"}]
+        messages += tool_turn("read_file", ["x" * 3000] * 8)
+
+        self.assertEqual(self.client.compact_messages(messages), messages)
+
+    def test_only_earlier_turns_are_summarized(self):
+        messages = [{"role": "user", "content": "first"}]
+        messages += tool_turn("read_file", ["a" * 3000, "b" * 3000])
+        messages.append({"role": "assistant", "content": "done"})
+        messages.append({"role": "user", "content": "second"})
+        messages += tool_turn("query_db", ["c" * 3000] * 4)
+
+        compacted = self.client.compact_messages(messages)
+
+        self.assertEqual(len(compacted), len(messages))
+        old = compacted[2:4]
+        self.assertTrue(all(is_summary(m) for m in old))
+        self.assertIn("read_file returned 3000 characters", old[0]["content"])
+        current = compacted[7:]
+        self.assertEqual(current, messages[7:])
+        # Everything but tool results is kept
+        self.assertEqual(compacted[:2], messages[:2])
+        self.assertEqual(compacted[4:7], messages[4:7])
+
+
+
+class ResponseCacheTest(unittest.TestCase):
+
+    REPLY = b'{"message": {"role": "assistant", "content": "hi"}}'
+
+    def make_client(self, **kwargs):
+        client = LLMClient(**kwargs)
+        self.addCleanup(client.close)
+        client._before_request = lambda: None
+        client._session.post = mock.Mock(return_value=mock.Mock(content=self.REPLY))
+        return client
+
+    def ask_twice(self, client, messages):
+        for _ in range(2):
+            self.assertEqual(client.chat(messages, [])["message"]["content"], "hi")
+        return client._session.post.call_count
+
+    def test_off_by_default(self):
+        with mock.patch.dict(os.environ):
+            os.environ.pop("MCP_LLM_CACHE_TTL", None)
+            get_config.cache_clear()
+            self.addCleanup(get_config.cache_clear)
+            client = self.make_client()
+        self.assertEqual(client.cache_ttl, 0)
+        self.assertEqual(self.ask_twice(client, [{"role": "user", "content": "hi"}]), 2)
+
+    def test_repeated_request_is_served_from_cache(self):
+        client = self.make_client(cache_ttl=60)
+        self.assertEqual(self.ask_twice(client, [{"role": "user", "content": "hi"}]), 1)
+
+    def test_requests_with_tool_results_are_not_cached(self):
+        client = self.make_client(cache_ttl=60)
+        messages = [{"role": "user", "content": "read it"}]
+        messages += tool_turn("read_file", ["old content"])
+        self.assertEqual(self.ask_twice(client, messages), 2)
+
+
+
+class CircuitBreakerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.now = 1000.0
+        patcher = mock.patch("lib.llm_client.time.monotonic", lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.breaker = CircuitBreaker(max_failures=3, window=30, cooldown=30)
+
+    def trip(self):
+        for _ in range(3):
+            self.breaker.record_failure()
+        self.assertFalse(self.breaker.allow())
+
+    def test_opens_after_max_failures(self):
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        self.assertTrue(self.breaker.allow())
+        self.trip()
+
+    def test_failed_trial_reopens(self):
+        self.trip()
+        self.now += 31
+        self.assertTrue(self.breaker.allow())
+        # The trial request itself can take longer than `window`
+        self.now += 60
+        self.breaker.record_failure()
+        self.assertFalse(self.breaker.allow())
+
+    def test_successful_trial_closes(self):
+        self.trip()
+        self.now += 31
+        self.assertTrue(self.breaker.allow())
+        self.breaker.record_success()
+        self.breaker.record_failure()
+        self.assertTrue(self.breaker.allow())
+
+
+if __name__ == "__main__":
+    unittest.main()
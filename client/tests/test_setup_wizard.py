@@ -0,0 +1,50 @@
+"""
+Unit tests for the setup wizard's Ollama URL check.
+
+Run from the client directory:
+    python -m unittest discover -s tests
+"""
+
+import io
+import os
+import sys
+import unittest
+from contextlib import redirect_stdout
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import setup_wizard  # noqa: E402
+
+
+class OllamaUrlTest(unittest.TestCase):
+
+    def test_accepts_http_urls(self):
+        for url in ("http://localhost:11434", "https://ollama.example.com/api",
+                    "http://[::1]:11434", "http://192.168.1.10"):
+            self.assertTrue(setup_wizard.is_ollama_url(url), url)
+
+    def test_rejects_other_urls(self):
+        for url in ("localhost:11434", "ftp://host", "http://", "http://host:99999",
+                    "http://host:port"):
+            self.assertFalse(setup_wizard.is_ollama_url(url), url)
+
+    def test_batch_mode_exits_on_a_bad_url(self):
+        env = {"MCP_SETUP_OLLAMA_MODE": "external", "MCP_SETUP_OLLAMA_URL": "localhost:11434"}
+        with mock.patch.object(setup_wizard, "INTERACTIVE", False), \
+                mock.patch.dict(os.environ, env), redirect_stdout(io.StringIO()) as out:
+            with self.assertRaises(SystemExit) as cm:
+                setup_wizard.configure_ollama()
+        self.assertEqual(cm.exception.code, 1)
+        self.assertIn("not an http(s) URL", out.getvalue())
+
+    def test_batch_mode_accepts_an_ipv6_url(self):
+        env = {"MCP_SETUP_OLLAMA_MODE": "external", "MCP_SETUP_OLLAMA_URL": "http://[::1]:11434"}
+        with mock.patch.object(setup_wizard, "INTERACTIVE", False), \
+                mock.patch.dict(os.environ, env), redirect_stdout(io.StringIO()):
+            url, _ = setup_wizard.configure_ollama()
+        self.assertEqual(url, "http://[::1]:11434")
+
+
+if __name__ == "__main__":
+    unittest.main()
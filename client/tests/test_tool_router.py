@@ -0,0 +1,181 @@
+"""
+Unit tests for ToolRouter: result cache, repeated-failure guard and how
+results are formatted for the LLM.
+
+Run from the client directory:
+    python -m unittest discover -s tests
+"""
+
+import asyncio
+import importlib.util
+import json
+import os
+import sys
+import time
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lib.tool_router import ToolRouter  # noqa: E402
+
+
+class FakeClient:
+    """Stands in for an MCPClient: counts calls, answers with a counter."""
+
+    def __init__(self):
+        self.calls = []
+
+    async def call_tool(self, name, arguments):
+        self.calls.append((name, arguments))
+        return [{"call": len(self.calls)}]
+
+
+class ResultCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        tools = ("query_db", "list_tables", "describe_table", "read_file")
+        self.router = ToolRouter({name: "http://db/mcp" for name in tools})
+        self.client = FakeClient()
+        for name in tools:
+            self.router.host.tool_registry[name] = self.client
+
+    def call(self, name, **arguments):
+        return asyncio.run(self.router._execute_tool_async(name, arguments))
+
+    def test_select_is_cached(self):
+        first = self.call("query_db", sql="SELECT * FROM users")
+        second = self.call("query_db", sql="SELECT * FROM users")
+        self.assertEqual(first, second)
+        self.assertEqual(len(self.client.calls), 1)
+
+    def test_write_drops_database_results(self):
+        self.call("query_db", sql="SELECT * FROM users")
+        self.call("list_tables")
+        self.call("read_file", path="hello.txt")
+
+        self.call("query_db", sql="INSERT INTO users (username) VALUES ('x')")
+        self.assertEqual(len(self.client.calls), 4)
+
+        self.call("query_db", sql="SELECT * FROM users")
+        self.call("list_tables")
+        self.assertEqual(len(self.client.calls), 6)
+        # Files are not affected by database writes
+        self.call("read_file", path="hello.txt")
+        self.assertEqual(len(self.client.calls), 6)
+
+    def test_select_into_is_not_cached(self):
+        self.call("query_db", sql="SELECT * INTO backup FROM users")
+        self.call("query_db", sql="SELECT * INTO backup FROM users")
+        self.assertEqual(len(self.client.calls), 2)
+
+
+
+class FlakyClient:
+    """Fails while `down` is set, like a server that is restarting."""
+
+    def __init__(self):
+        self.down = True
+        self.calls = 0
+
+    async def call_tool(self, name, arguments):
+        self.calls += 1
+        if self.down:
+            raise ConnectionError("server unavailable")
+        return "ok"
+
+
+class RepeatedFailureTest(unittest.TestCase):
+
+    CALL = {"function": {"name": "read_file", "arguments": {"path": "a.txt"}}}
+
+    def setUp(self):
+        self.router = ToolRouter({"read_file": "http://file/mcp"}, cache_ttl=0)
+        self.client = FlakyClient()
+        self.router.host.tool_registry["read_file"] = self.client
+
+    def call(self):
+        return asyncio.run(self.router._execute_tool_call_async(self.CALL))
+
+    def test_blocked_calls_are_not_counted(self):
+        for _ in range(5):
+            result = self.call()
+        self.assertEqual(self.client.calls, 2)
+        self.assertIn("already failed 2 times", result["error"])
+
+    def test_call_runs_again_after_clear_cache(self):
+        self.call(), self.call(), self.call()
+        self.client.down = False
+        self.assertIn("error", self.call())
+
+        self.router.clear_cache()
+        self.assertEqual(self.call(), {"content": "ok"})
+        self.assertEqual(self.client.calls, 3)
+
+    def test_call_runs_again_after_failure_ttl(self):
+        self.call(), self.call()
+        self.client.down = False
+        later = time.monotonic() + self.router.failure_ttl + 1
+        with mock.patch("lib.tool_router.time.monotonic", return_value=later):
+            self.assertEqual(self.call(), {"content": "ok"})
+        self.assertEqual(self.router._failures, {})
+
+
+
+async def fastmcp_result(value):
+    """What MCPClient.call_tool returns for a FastMCP tool returning value."""
+    from fastmcp import FastMCP, Client
+    from lib.mcp_client import MCPClient
+
+    server = FastMCP("test")
+
+    @server.tool()
+    def query_db(sql: str) -> dict:
+        return value
+
+    async with Client(server) as client:
+        result = await client.call_tool_mcp("query_db", {"sql": "SELECT 1"})
+    return MCPClient._extract_content(result)
+
+
+class FormatResultsTest(unittest.TestCase):
+
+    ROWS = {"rows": [{"id": 1, "username": "alice"}, {"id": 2, "username": "bob"}],
+            "truncated": False}
+    TOON = "rows[2]{id,username}:\n  1,alice\n  2,bob\ntruncated: false"
+
+    def format(self, toon_tables, value, call_tool=None):
+        """Run query_db through the router and format its result for the LLM."""
+        async def send_as_fastmcp(name, arguments):
+            # FastMCP sends a dict return value as one compact JSON text item
+            return json.dumps(value, separators=(",", ":"))
+
+        router = ToolRouter({"query_db": "http://db/mcp"}, toon_tables=toon_tables)
+        client = FakeClient()
+        client.call_tool = call_tool or send_as_fastmcp
+        router.host.tool_registry["query_db"] = client
+        result = asyncio.run(router._execute_tool_async("query_db", {"sql": "SELECT 1"}))
+        return router.format_tool_results_for_llm([result])[0]["content"]
+
+    def test_query_db_rows_as_toon(self):
+        self.assertEqual(self.format(True, self.ROWS), self.TOON)
+
+    @unittest.skipUnless(importlib.util.find_spec("fastmcp"), "fastmcp is not installed")
+    def test_query_db_rows_from_a_real_fastmcp_server(self):
+        def call_tool(name, arguments):
+            return fastmcp_result(self.ROWS)
+
+        self.assertEqual(self.format(True, self.ROWS, call_tool), self.TOON)
+
+    def test_json_without_toon(self):
+        self.assertEqual(json.loads(self.format(False, self.ROWS)), self.ROWS)
+
+    def test_results_that_are_not_tables_stay_as_sent(self):
+        status = {"status": "success", "rows_affected": 1}
+        self.assertEqual(json.loads(self.format(True, status)), status)
+        nested = {"rows": [{"id": 1, "tags": ["a"]}], "truncated": False}
+        self.assertEqual(json.loads(self.format(True, nested)), nested)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,146 @@
+"""
+Unit tests for lib.toon.
+
+The tests read tables back with a small decoder written for this purpose,
+so every value can be checked to survive encoding.
+
+Run from the client directory:
+    python -m unittest discover -s tests
+"""
+
+import json
+import os
+import re
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lib import toon  # noqa: E402
+
+_HEADER_RE = re.compile(r"(\w+)\[(\d+)\]\{(.*)\}:")
+
+
+def split_values(line):
+    """Split a row on commas outside quoted strings."""
+    values, current, quoted, escaped = [], "", False, False
+    for char in line:
+        if quoted:
+            current += char
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                quoted = False
+        elif char == '"':
+            quoted = True
+            current += char
+        elif char == ",":
+            values.append(current)
+            current = ""
+        else:
+            current += char
+    values.append(current)
+    return values
+
+
+def decode_value(text):
+    """Quoted strings, numbers, true/false/null use JSON syntax; the rest is bare text."""
+    if text.startswith('"') or text in ("true", "false", "null") or toon._NUMBER_RE.fullmatch(text):
+        return json.loads(text)
+    return text
+
+
+def decode_table(text):
+    """Parse encode_table() output back into (name, rows)."""
+    header, *lines = text.split("\n")
+    name, count, keys = _HEADER_RE.fullmatch(header).groups()
+    keys = [decode_value(key) for key in split_values(keys)]
+    assert len(lines) == int(count)
+    rows = []
+    for line in lines:
+        assert line.startswith("  ")
+        rows.append(dict(zip(keys, map(decode_value, split_values(line[2:])), strict=True)))
+    return name, rows
+
+
+class EncodeTableTest(unittest.TestCase):
+
+    def assertRoundTrip(self, rows):
+        name, decoded = decode_table(toon.encode_table(rows))
+        self.assertEqual(name, "data")
+        self.assertEqual(decoded, rows)
+
+    def test_layout(self):
+        self.assertEqual(
+            toon.encode_table([{"id": 1, "name": "alice"}, {"id": 2, "name": "bob"}], name="users"),
+            "users[2]{id,name}:\n  1,alice\n  2,bob",
+        )
+
+    def test_plain_values_round_trip(self):
+        self.assertRoundTrip([
+            {"id": 1, "score": 2.5, "big": 10 ** 20, "ok": True, "note": None, "name": "alice"},
+            {"id": -2, "score": -0.5, "big": 0, "ok": False, "note": None, "name": "bob smith"},
+        ])
+
+    def test_strings_that_need_quotes_round_trip(self):
+        tricky = [
+            "a,b", "key: value", 'say "hi"', "back\\slash", "line\nbreak", "tab\there",
+            "[1]", "{x}", "", " padded ", "true", "false", "null", "42", "-1.5e3",
+            "-dash", "é ünïcødé", "1,2,3",
+        ]
+        self.assertRoundTrip([{"id": n, "text": text} for n, text in enumerate(tricky)])
+
+    def test_keys_that_need_quotes_round_trip(self):
+        self.assertRoundTrip([{"a,b": 1, "c:d": 2, "plain": 3}])
+
+    def test_json_string_rows_are_accepted(self):
+        name, rows = decode_table(toon.encode_table(['{"id": 1, "t": "x"}', '{"id": 2, "t": "y"}']))
+        self.assertEqual(rows, [{"id": 1, "t": "x"}, {"id": 2, "t": "y"}])
+
+    def test_data_that_is_not_a_table_stays_json(self):
+        for rows in (
+            [],
+            [{}],
+            [{"id": 1, "tags": ["a", "b"]}],
+            [{"id": 1, "meta": {"k": "v"}}],
+            [{"id": 1, "tags": []}],
+            [{"id": 1}, {"id": 2, "extra": 3}],
+            [{"id": 1}, {"other": 2}],
+            [1, 2, 3],
+            ["plain text"],
+            ['{"broken'],
+            ["[1, 2]"],
+        ):
+            with self.subTest(rows=rows):
+                self.assertIsNone(toon.encode_table(rows))
+
+
+
+class EncodeResultTest(unittest.TestCase):
+
+    def test_list_of_records(self):
+        self.assertEqual(toon.encode_result([{"a": 1}]), toon.encode_table([{"a": 1}]))
+
+    def test_rows_object(self):
+        self.assertEqual(
+            toon.encode_result({"rows": [{"id": 1}], "truncated": True}),
+            "rows[1]{id}:\n  1\ntruncated: true",
+        )
+
+    def test_other_results_stay_json(self):
+        for value in (
+            "text",
+            {"status": "success", "rows_affected": 1},
+            {"rows": [], "truncated": False},
+            {"rows": [{"id": 1}], "more": [{"id": 2}]},
+            {"rows": [{"id": 1}], "meta": {"k": "v"}},
+            {"bad name": [{"id": 1}]},
+        ):
+            with self.subTest(value=value):
+                self.assertIsNone(toon.encode_result(value))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+"""
+Unit tests for lib.ui.ConsoleBuffer.
+
+Run from the client directory:
+    python -m unittest discover -s tests
+"""
+
+import io
+import os
+import sys
+import threading
+import time
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lib.ui import ConsoleBuffer, print_step  # noqa: E402
+
+
+class ConsoleBufferTest(unittest.TestCase):
+
+    def setUp(self):
+        self.out = io.StringIO()
+
+    def test_output_is_written_at_step_headers_and_exit(self):
+        with ConsoleBuffer(self.out):
+            print("one")
+            self.assertEqual(self.out.getvalue(), "")
+            print_step(2, "Next")
+            self.assertIn("one\n", self.out.getvalue())
+            print("two")
+        self.assertTrue(self.out.getvalue().endswith("two\n"))
+
+    def test_buffered_output_is_written_during_a_long_wait(self):
+        with ConsoleBuffer(self.out) as buffer:
+            print("Sending request...")
+            time.sleep(buffer.FLUSH_INTERVAL * 5)
+            self.assertEqual(self.out.getvalue(), "Sending request...\n")
+
+    def test_other_threads_are_not_buffered(self):
+        with ConsoleBuffer(self.out):
+            print("agent")
+            thread = threading.Thread(target=print, args=("other thread",))
+            thread.start()
+            thread.join()
+            # Written at once, after what the agent had already printed
+            self.assertEqual(self.out.getvalue(), "agent\nother thread\n")
+
+    def test_stdout_is_restored(self):
+        stdout = sys.stdout
+        with ConsoleBuffer(self.out):
+            self.assertIsNot(sys.stdout, stdout)
+        self.assertIs(sys.stdout, stdout)
+        self.assertIsNone(ConsoleBuffer.active)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -17,10 +17,20 @@ Learning Points:
 - The run() method handles all transport details
 """
 
+import itertools
 import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional, Tuple
+
 import psycopg2
+import psycopg2.errors
 from psycopg2.extras import RealDictCursor
+from psycopg2.pool import ThreadedConnectionPool
 from fastmcp import FastMCP
+from starlette.concurrency import run_in_threadpool
 
 # Initialize the MCP server
 mcp = FastMCP("MCP Database Server")
@@ -34,13 +44,279 @@ DB_CONFIG = {
 }
 
 
-def get_db_connection():
-    """Create and return a database connection."""
-    return psycopg2.connect(**DB_CONFIG)
+# Longest a statement may run, in milliseconds (0 = no limit). A runaway
+# query from the LLM fails fast instead of holding a pooled connection
+DB_STATEMENT_TIMEOUT_MS = int(os.environ.get("DB_STATEMENT_TIMEOUT_MS", "5000"))
+
+
+# Seconds list_tables/describe_table answers are reused (0 disables)
+SCHEMA_CACHE_TTL = float(os.environ.get("DB_SCHEMA_CACHE_TTL", "60"))
+SCHEMA_CACHE_SIZE = 256
+
+# Statements query_db accepts, by first keyword. Anything else (prose, a
+# markdown fence...) is rejected before it costs a round-trip to PostgreSQL.
+# DDL stays allowed: this is a lab, and the client doesn't block it either
+STATEMENT_KEYWORDS = (
+    "SELECT", "INSERT", "UPDATE", "DELETE", "WITH", "VALUES", "TABLE",
+    "EXPLAIN", "SHOW", "SET", "CREATE", "ALTER", "DROP", "TRUNCATE",
+)
+
+_STATEMENT_RE = re.compile(
+    r"\(*\s*(?:" + "|".join(STATEMENT_KEYWORDS) + r")\b", re.IGNORECASE
+)
+
+# Statements that can change the schema - they empty the cache
+_DDL_RE = re.compile(r"\b(CREATE|ALTER|DROP|TRUNCATE|RENAME)\b", re.IGNORECASE)
+
+# key -> (expires_at, value)
+_schema_cache: Dict[str, Tuple[float, Any]] = {}
+
+
+def _cached_schema(key: str) -> Optional[Any]:
+    """Return a cached schema answer, or None if missing or expired."""
+    entry = _schema_cache.get(key)
+    if entry is None or entry[0] < time.monotonic():
+        return None
+    return entry[1]
+
+
+def _store_schema(key: str, value: Any) -> None:
+    """Remember a schema answer for SCHEMA_CACHE_TTL seconds."""
+    if SCHEMA_CACHE_TTL <= 0:
+        return
+    if len(_schema_cache) >= SCHEMA_CACHE_SIZE:
+        _schema_cache.clear()
+    _schema_cache[key] = (time.monotonic() + SCHEMA_CACHE_TTL, value)
+
+
+# Most rows query_db returns, for any statement (0 = no limit). Every row
+# sent ends up in the LLM's prompt; the bundled client only cuts a result
+# blindly past 10,000 characters (sanitize_output), often mid-row. A row
+# limit with a "truncated" flag lets the model know there is more
+DB_MAX_ROWS = int(os.environ.get("DB_MAX_ROWS", "1000"))
+
+# Rows fetched per round-trip from a server-side cursor
+DB_FETCH_SIZE = 500
+
+# A single plain SELECT - the only statement run through a server-side
+# cursor. SELECT ... INTO creates a table, which a cursor declaration refuses
+_SELECT_RE = re.compile(r"\s*SELECT\b", re.IGNORECASE)
+_INTO_RE = re.compile(r"\bINTO\b", re.IGNORECASE)
+
+# Most connections kept open at the same time
+DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", "10"))
+
+# Created on first use: PostgreSQL may still be starting when we start
+_pool: Optional[ThreadedConnectionPool] = None
+_pool_lock = threading.Lock()
+
+# ThreadedConnectionPool raises PoolError when it is empty; worker threads
+# wait here for a free connection instead
+_pool_slots = threading.BoundedSemaphore(DB_POOL_SIZE)
+
+
+def get_pool() -> ThreadedConnectionPool:
+    """Return the connection pool, creating it on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadedConnectionPool(
+                minconn=1,
+                maxconn=DB_POOL_SIZE,
+                # Set once per connection, not per query
+                options=f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}",
+                **DB_CONFIG,
+            )
+    return _pool
+
+
+@contextmanager
+def get_db_connection() -> Iterator["psycopg2.extensions.connection"]:
+    """
+    Borrow a database connection from the pool.
+
+    Learning Point:
+        Opening a PostgreSQL connection costs a TCP handshake, an
+        authentication exchange and a new backend process on the server -
+        often more than the query itself. A pool opens connections once
+        and lends them out, so a tool call only pays for its query.
+
+        Connections are in autocommit mode: each statement commits on its
+        own, without the extra BEGIN/COMMIT round-trips of a transaction.
+    """
+    pool = get_pool()
+    with _pool_slots:
+        conn = pool.getconn()
+        try:
+            conn.autocommit = True
+            yield conn
+        finally:
+            # A connection that broke (e.g. PostgreSQL restarted) is discarded
+            pool.putconn(conn, close=bool(conn.closed))
+
+
+def _take_rows(cur) -> Tuple[list, bool]:
+    """Read up to DB_MAX_ROWS rows from cur, and whether more were left."""
+    if DB_MAX_ROWS <= 0:
+        return list(cur), False
+    # One row past the limit tells whether anything was cut off
+    rows = list(itertools.islice(cur, DB_MAX_ROWS + 1))
+    more = len(rows) > DB_MAX_ROWS
+    if more:
+        rows.pop()
+    return rows, more
+
+
+def _stream_select(conn, sql: str) -> Tuple[list, bool]:
+    """
+    Run a SELECT through a server-side (named) cursor.
+
+    Returns:
+        The rows (at most DB_MAX_ROWS) and whether more were left
+
+    Learning Point:
+        A normal cursor makes libpq download the whole result set into
+        client memory at execute() time, before we look at a single row.
+        A named cursor leaves the result on the server and fetches it
+        DB_FETCH_SIZE rows at a time, so we stop after DB_MAX_ROWS rows
+        without ever holding the rest.
+    """
+    # Named cursors only exist inside a transaction. get_db_connection()
+    # turns autocommit back on for the next borrower
+    conn.autocommit = False
+    try:
+        with conn.cursor(name="query_db", cursor_factory=RealDictCursor) as cur:
+            cur.itersize = DB_FETCH_SIZE
+            cur.execute(sql)
+            rows, more = _take_rows(cur)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return rows, more
+
+
+def _is_plain_select(sql: str) -> bool:
+    """Whether sql can run through a named cursor (see _stream_select)."""
+    # Several statements can't go through one cursor declaration
+    return (
+        _SELECT_RE.match(sql) is not None
+        and ";" not in sql.rstrip().rstrip(";")
+        and _INTO_RE.search(sql) is None
+    )
+
+
+def _skip_leading_comments(sql: str) -> str:
+    """Return sql without the whitespace and comments before its first keyword."""
+    pos = 0
+    while True:
+        while pos < len(sql) and sql[pos].isspace():
+            pos += 1
+        if sql.startswith("--", pos):
+            end = sql.find("\n", pos)
+        elif sql.startswith("/*", pos):
+            end = sql.find("*/", pos + 2)
+            if end >= 0:
+                end += 1
+        else:
+            return sql[pos:]
+        if end < 0:
+            # The comment runs to the end: there is no statement
+            return ""
+        pos = end + 1
+
+
+def _check_statement(sql: str) -> None:
+    """
+    Refuse text that doesn't start with a known SQL keyword.
+
+    Leading "-- line" and "/* block */" comments are skipped (a plain
+    loop rather than a regex, which backtracks badly on "/*/*/*...").
+
+    Raises:
+        ValueError: Naming the accepted keywords (see STATEMENT_KEYWORDS)
+    """
+    if not _STATEMENT_RE.match(_skip_leading_comments(sql)):
+        raise ValueError(
+            "Query error: expected a SQL statement starting with "
+            f"{', '.join(STATEMENT_KEYWORDS[:-1])} or {STATEMENT_KEYWORDS[-1]}, "
+            f"got: {sql[:50]!r}"
+        )
+
+
+def _run_query(sql: str) -> dict:
+    """Blocking body of query_db (runs in a worker thread)."""
+    with get_db_connection() as conn:
+        try:
+            if _is_plain_select(sql):
+                rows, more = _stream_select(conn, sql)
+                return {"rows": rows, "truncated": more}
+
+            cur = conn.cursor(cursor_factory=RealDictCursor)
+            cur.execute(sql)
+
+            # Check if query returns rows (SELECT, WITH, ... RETURNING) or is a
+            # mutation. Mutations are already committed (autocommit, see
+            # get_db_connection). Rows are RealDictRow, already a dict
+            # subclass - no per-row copy needed. Here libpq has already
+            # downloaded every row: the limit only bounds what is sent back
+            if cur.description:
+                rows, more = _take_rows(cur)
+                result = {"rows": rows, "truncated": more}
+            else:
+                result = {"status": "success", "rows_affected": cur.rowcount}
+
+            cur.close()
+            return result
+
+        except psycopg2.errors.QueryCanceled:
+            raise ValueError(
+                f"Query error: the query ran longer than {DB_STATEMENT_TIMEOUT_MS} ms "
+                "and was cancelled - narrow it down with WHERE or LIMIT"
+            )
+        except Exception as e:
+            raise ValueError(f"Query error: {str(e)}")
+
+
+def _list_tables() -> list[str]:
+    """Blocking body of list_tables (runs in a worker thread)."""
+    with get_db_connection() as conn:
+        cur = conn.cursor()
+        cur.execute("""
+            SELECT tablename FROM pg_tables
+            WHERE schemaname = 'public'
+            ORDER BY tablename
+        """)
+        tables = [row[0] for row in cur.fetchall()]
+        cur.close()
+        return tables
+
+
+def _describe_table(table_name: str) -> list[dict]:
+    """Blocking body of describe_table (runs in a worker thread)."""
+    with get_db_connection() as conn:
+        cur = conn.cursor(cursor_factory=RealDictCursor)
+        # pg_catalog directly: information_schema.columns is a view with
+        # many joins and permission checks, and much slower to plan and run
+        cur.execute("""
+            SELECT a.attname AS column_name,
+                   format_type(a.atttypid, a.atttypmod) AS data_type,
+                   CASE WHEN a.attnotnull THEN 'NO' ELSE 'YES' END AS is_nullable
+            FROM pg_attribute a
+            JOIN pg_class c ON c.oid = a.attrelid
+            JOIN pg_namespace n ON n.oid = c.relnamespace
+            WHERE n.nspname = 'public' AND c.relname = %s
+              AND c.relkind IN ('r', 'p', 'v', 'f')  -- tables and views, not indexes
+              AND a.attnum > 0 AND NOT a.attisdropped
+            ORDER BY a.attnum
+        """, (table_name,))
+        columns = cur.fetchall()
+        cur.close()
+    return columns
 
 
 @mcp.tool()
-def query_db(sql: str) -> list[dict]:
+async def query_db(sql: str) -> dict:
     """
     Execute a SQL query against the database.
 
@@ -53,64 +329,51 @@ def query_db(sql: str) -> list[dict]:
         sql: SQL query to execute (SELECT, INSERT, UPDATE, DELETE)
 
     Returns:
-        For SELECT queries: List of dictionaries with query results
-        For other queries: Status and rows affected
+        For statements that return rows (SELECT, WITH, ... RETURNING):
+            {"rows": [{column: value, ...}, ...], "truncated": bool}.
+            truncated is true when only the first rows were returned -
+            add a WHERE or LIMIT to see the rest
+        For other statements (INSERT, UPDATE, DELETE, CREATE...):
+            {"status": "success", "rows_affected": int}
 
     Examples:
         - SELECT * FROM users
         - SELECT n.*, u.username FROM notes n JOIN users u ON n.user_id = u.id
         - SELECT * FROM notes WHERE title ILIKE '%shopping%'
     """
-    conn = get_db_connection()
+    # psycopg2 blocks, and FastMCP runs tools on its event loop: a slow
+    # query would stall every other request to the server. The blocking
+    # work runs in a worker thread while the loop keeps serving.
+    # (Not in the docstring - that is the tool description the LLM reads.)
+    _check_statement(sql)
     try:
-        cur = conn.cursor(cursor_factory=RealDictCursor)
-        cur.execute(sql)
-
-        # Check if query returns rows (SELECT) or is a mutation (INSERT/UPDATE/DELETE)
-        if cur.description:
-            rows = cur.fetchall()
-            result = [dict(row) for row in rows]
-        else:
-            conn.commit()
-            result = [{"status": "success", "rows_affected": cur.rowcount}]
-
-        cur.close()
-        return result
-
-    except Exception as e:
-        conn.rollback()
-        raise ValueError(f"Query error: {str(e)}")
-
+        return await run_in_threadpool(_run_query, sql)
     finally:
-        conn.close()
+        # Cleared once the statement has run, so a concurrent list_tables
+        # can't cache the old schema. A false match only costs a refill
+        if _DDL_RE.search(sql):
+            _schema_cache.clear()
 
 
 @mcp.tool()
-def list_tables() -> list[str]:
+async def list_tables() -> list[str]:
     """
     List all tables in the database.
 
     Returns:
         List of table names in the public schema
     """
-    conn = get_db_connection()
-    try:
-        cur = conn.cursor()
-        cur.execute("""
-            SELECT tablename FROM pg_tables
-            WHERE schemaname = 'public'
-            ORDER BY tablename
-        """)
-        tables = [row[0] for row in cur.fetchall()]
-        cur.close()
-        return tables
-
-    finally:
-        conn.close()
+    # The schema rarely changes, and an agent asks for it on every planning
+    # turn: reuse the answer for a while instead of querying again
+    tables = _cached_schema("tables")
+    if tables is None:
+        tables = await run_in_threadpool(_list_tables)
+        _store_schema("tables", tables)
+    return tables
 
 
 @mcp.tool()
-def describe_table(table_name: str) -> list[dict]:
+async def describe_table(table_name: str) -> list[dict]:
     """
     Get the schema/columns of a specific table.
 
@@ -120,28 +383,22 @@ def describe_table(table_name: str) -> list[dict]:
     Returns:
         List of column definitions with name, type, and nullable info
     """
-    conn = get_db_connection()
-    try:
-        cur = conn.cursor(cursor_factory=RealDictCursor)
-        cur.execute("""
-            SELECT column_name, data_type, is_nullable
-            FROM information_schema.columns
-            WHERE table_schema = 'public' AND table_name = %s
-            ORDER BY ordinal_position
-        """, (table_name,))
-        columns = [dict(row) for row in cur.fetchall()]
-        cur.close()
+    key = f"table:{table_name}"
+    columns = _cached_schema(key)
+    if columns is None:
+        columns = await run_in_threadpool(_describe_table, table_name)
 
         if not columns:
             raise ValueError(f"Table '{table_name}' not found")
 
-        return columns
+        _store_schema(key, columns)
 
-    finally:
-        conn.close()
+    return columns
 
 
 if __name__ == "__main__":
     print(f"Starting MCP DB Server on port 3334... DB_HOST={DB_CONFIG['host']}")
     # Run with HTTP transport - clean API!
+    # uvicorn uses uvloop and httptools when installed (see requirements.txt).
+    # One worker process on purpose: MCP sessions live in this process's memory
     mcp.run(transport="http", host="0.0.0.0", port=3334)
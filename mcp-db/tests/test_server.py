@@ -0,0 +1,133 @@
+"""
+Unit tests for the database server's helpers (no database needed: the
+connection is replaced with a fake where one is used).
+
+Run from the mcp-db directory:
+    python -m unittest discover -s tests
+"""
+
+import os
+import sys
+import unittest
+from contextlib import contextmanager
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import server  # noqa: E402
+
+
+class CheckStatementTest(unittest.TestCase):
+
+    def test_known_statements_are_accepted(self):
+        for sql in (
+            "SELECT * FROM users",
+            "  select 1",
+            "(SELECT 1) UNION (SELECT 2)",
+            "WITH t AS (SELECT 1) SELECT * FROM t",
+            "INSERT INTO notes (title) VALUES ('x')",
+            "SHOW statement_timeout",
+            "TABLE users",
+            "SET search_path TO public",
+        ):
+            with self.subTest(sql=sql):
+                server._check_statement(sql)
+
+    def test_leading_comments_are_skipped(self):
+        for sql in (
+            "-- note\nSELECT 1",
+            "/* note */ SELECT 1",
+            "/* a */\n-- b\n  /* c\n d */ (SELECT 1)",
+            "/*/ still a comment */ SELECT 1",
+        ):
+            with self.subTest(sql=sql):
+                server._check_statement(sql)
+
+    def test_other_text_is_refused(self):
+        for sql in (
+            "",
+            "Here is the query: SELECT 1",
+            "```sql\nSELECT 1\n```",
+            "-- SELECT 1",
+            "/* SELECT 1",
+            "/* SELECT 1 */",
+            "/*" * 5000,
+        ):
+            with self.subTest(sql=sql[:40]):
+                with self.assertRaises(ValueError):
+                    server._check_statement(sql)
+
+    def test_message_lists_every_keyword(self):
+        with self.assertRaises(ValueError) as caught:
+            server._check_statement("hello")
+        for keyword in server.STATEMENT_KEYWORDS:
+            self.assertIn(keyword, str(caught.exception))
+
+
+
+class FakeCursor:
+    """A cursor over fixed rows (description is None without rows)."""
+
+    def __init__(self, rows, rowcount=-1):
+        self.rows = rows
+        self.rowcount = rowcount
+        self.description = [("id",)] if rows is not None else None
+        self.executed = []
+
+    def execute(self, sql):
+        self.executed.append(sql)
+
+    def __iter__(self):
+        return iter(self.rows)
+
+    def close(self):
+        pass
+
+
+class RowLimitTest(unittest.TestCase):
+
+    def setUp(self):
+        patcher = mock.patch.object(server, "DB_MAX_ROWS", 3)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def run_query(self, sql, cursor):
+        conn = mock.Mock()
+        conn.cursor.return_value = cursor
+
+        @contextmanager
+        def fake_connection():
+            yield conn
+
+        with mock.patch.object(server, "get_db_connection", fake_connection):
+            return server._run_query(sql), conn
+
+    def test_take_rows(self):
+        self.assertEqual(server._take_rows(iter([1, 2, 3])), ([1, 2, 3], False))
+        self.assertEqual(server._take_rows(iter([1, 2, 3, 4, 5])), ([1, 2, 3], True))
+        with mock.patch.object(server, "DB_MAX_ROWS", 0):
+            self.assertEqual(server._take_rows(iter([1, 2, 3, 4])), ([1, 2, 3, 4], False))
+
+    def test_only_a_plain_select_uses_a_named_cursor(self):
+        self.assertTrue(server._is_plain_select("SELECT * FROM users;"))
+        for sql in ("SELECT * INTO backup FROM users",
+                    "SELECT 1; SELECT 2",
+                    "WITH t AS (SELECT 1) SELECT * FROM t",
+                    "DELETE FROM users RETURNING id"):
+            with self.subTest(sql=sql):
+                self.assertFalse(server._is_plain_select(sql))
+
+    def test_flag_is_kept_apart_from_the_rows(self):
+        rows = [{"id": n} for n in range(5)]
+        result, _ = self.run_query("WITH t AS (SELECT 1) SELECT * FROM t", FakeCursor(rows))
+        self.assertEqual(result, {"rows": rows[:3], "truncated": True})
+
+    def test_select_into_runs_on_a_normal_cursor(self):
+        result, conn = self.run_query("SELECT * INTO backup FROM users",
+                                      FakeCursor(None, rowcount=2))
+        self.assertEqual(result, {"status": "success", "rows_affected": 2})
+        self.assertNotIn("name", conn.cursor.call_args.kwargs)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -17,8 +17,21 @@ Learning Points:
 - The run() method handles all transport details
 """
 
+import asyncio
+import codecs
+import mimetypes
+import os
+import stat
+import threading
+import time
+from collections import OrderedDict
 from pathlib import Path
 from fastmcp import FastMCP
+from starlette.concurrency import run_in_threadpool
+from starlette.middleware import Middleware
+from starlette.middleware.gzip import GZipMiddleware
+from starlette.requests import Request
+from starlette.responses import FileResponse, PlainTextResponse, Response
 
 # Initialize the MCP server
 mcp = FastMCP("MCP File Server")
@@ -26,9 +39,208 @@ mcp = FastMCP("MCP File Server")
 # Data directory for file access
 DATA_DIR = Path("/data")
 
+# Largest file read_file returns in one piece. Bigger files are paged with
+# read_file_chunk, so a single call can't pull a huge file into memory
+MAX_READ_BYTES = int(os.environ.get("MAX_READ_BYTES", str(1024 * 1024)))
+
+# Largest piece read_file_chunk returns
+MAX_CHUNK_BYTES = 64 * 1024
+
+# Most file reads in progress at once. With MAX_READ_BYTES this bounds the
+# memory reads can hold (16 x 1 MiB by default), however many calls arrive
+MAX_CONCURRENT_READS = int(os.environ.get("MAX_CONCURRENT_READS", "16"))
+_read_slots = asyncio.Semaphore(MAX_CONCURRENT_READS)
+
+# DATA_DIR with symlinks resolved - once, here, instead of on every call.
+# Resolved paths inside it start with _DATA_PREFIX
+_DATA_ROOT = os.path.realpath(DATA_DIR)
+_DATA_PREFIX = os.path.join(_DATA_ROOT, "")
+
+# Seconds a missing file is remembered as missing. LLMs guess file names
+# and often retry the same wrong guess
+MISSING_CACHE_TTL = 2.0
+MISSING_CACHE_SIZE = 4096
+
+# resolved path -> expires_at
+_missing_files: dict[str, float] = {}
+
+# Small files read_file keeps decoded in memory, and how many of them.
+# The key includes mtime and size, so an edited file is simply a new key
+CONTENT_CACHE_MAX_BYTES = 64 * 1024
+CONTENT_CACHE_SIZE = 256
+
+# (resolved path, mtime_ns, size) -> text, least recently used first.
+# Reads run in worker threads, hence the lock
+_content_cache: "OrderedDict[tuple[str, int, int], str]" = OrderedDict()
+_content_cache_lock = threading.Lock()
+
+
+def resolve_data_path(path: str) -> str:
+    """
+    Resolve a path relative to DATA_DIR, refusing anything outside it.
+
+    Learning Point:
+        Resolving follows ".." and symlinks, so "../etc/passwd" or a link
+        pointing out of /data is caught by checking where the path really
+        ends up. Only the requested part needs resolving: the /data prefix
+        never changes, so its resolved form is computed once at start-up
+        and the check is a plain string prefix comparison.
+
+        Paths stay plain strings (os.path) rather than pathlib.Path
+        objects: every Path operation builds a new object, and these
+        handlers run on every tool call.
+
+        Nothing here is cached: a symlink can be repointed at any time,
+        and a cached answer would keep trusting its old target. realpath()
+        is a handful of lstat() calls, cheap next to the read itself.
+
+    Raises:
+        ValueError: If the path escapes DATA_DIR
+    """
+    # Obvious probes are refused by looking at the string alone, before
+    # any filesystem call. Absolute paths are still allowed through: the
+    # resolved-path check below decides ("/data/x.txt" is fine)
+    if "\0" in path:
+        raise ValueError("Access denied: Invalid path")
+    if ".." in path.replace("\\", "/").split("/"):
+        raise ValueError("Access denied: Path traversal attempt")
+
+    real = os.path.realpath(os.path.join(_DATA_ROOT, path))
+    if real != _DATA_ROOT and not real.startswith(_DATA_PREFIX):
+        raise ValueError("Access denied: Path traversal attempt")
+    return real
+
+
+def stat_data_file(path: str) -> tuple[str, os.stat_result]:
+    """
+    Resolve path inside DATA_DIR and check it is a regular file.
+
+    Returns:
+        The resolved path and its stat() result
+
+    Raises:
+        ValueError: If path escapes DATA_DIR or is not a file
+        FileNotFoundError: If the file doesn't exist
+    """
+    # Resolve the full path
+    # Security: Prevent path traversal attacks
+    requested_path = resolve_data_path(path)
+
+    # A recent miss for the same file is answered without the filesystem
+    expires_at = _missing_files.get(requested_path)
+    if expires_at is not None and expires_at > time.monotonic():
+        raise FileNotFoundError(f"File not found: {path}")
+
+    # Check file exists - one stat() answers both questions, where
+    # exists() + is_file() would ask the kernel twice
+    try:
+        st = os.stat(requested_path)
+    except FileNotFoundError:
+        if len(_missing_files) >= MISSING_CACHE_SIZE:
+            _missing_files.clear()
+        _missing_files[requested_path] = time.monotonic() + MISSING_CACHE_TTL
+        raise FileNotFoundError(f"File not found: {path}")
+
+    # Check it's actually a file
+    if not stat.S_ISREG(st.st_mode):
+        raise ValueError(f"Path is not a file: {path}")
+
+    return requested_path, st
+
+
+def _read_file(path: str) -> str:
+    """Blocking body of read_file (runs in a worker thread)."""
+    requested_path, st = stat_data_file(path)
+
+    if st.st_size > MAX_READ_BYTES:
+        raise ValueError(
+            f"File is too large to read at once ({st.st_size} bytes): "
+            f"use read_file_chunk to read it in pieces"
+        )
+
+    # The same small files are read over and over: reuse the decoded text
+    # while the file is unchanged (the stat above was needed anyway)
+    key = (requested_path, st.st_mtime_ns, st.st_size)
+    with _content_cache_lock:
+        content = _content_cache.get(key)
+        if content is not None:
+            _content_cache.move_to_end(key)
+            return content
+
+    # Read and return content
+    with open(requested_path, encoding="utf-8") as f:
+        content = f.read()
+
+    if st.st_size <= CONTENT_CACHE_MAX_BYTES:
+        with _content_cache_lock:
+            _content_cache[key] = content
+            if len(_content_cache) > CONTENT_CACHE_SIZE:
+                _content_cache.popitem(last=False)
+    return content
+
+
+def _decode_chunk(data: bytes, offset: int, final: bool) -> tuple[str, int]:
+    """
+    Decode the bytes read at offset, returning the text and next_offset.
+
+    A chunk can end in the middle of a multi-byte character: unless final,
+    those bytes are left for the next chunk (next_offset points at them).
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    content = decoder.decode(data, final=final)
+    return content, offset + len(data) - len(decoder.getstate()[0])
+
+
+def _read_file_chunk(path: str, offset: int = 0, length: int = MAX_CHUNK_BYTES) -> dict:
+    """Blocking body of read_file_chunk (runs in a worker thread)."""
+    requested_path, st = stat_data_file(path)
+
+    if offset < 0 or length <= 0:
+        raise ValueError("offset must be >= 0 and length > 0")
+    length = min(length, MAX_CHUNK_BYTES)
+
+    # pread reads at an offset in one call, without a separate seek
+    fd = os.open(requested_path, os.O_RDONLY)
+    try:
+        data = os.pread(fd, length, offset)
+        content, next_offset = _decode_chunk(data, offset, len(data) < length)
+        if next_offset == offset and len(data) == length:
+            # length is shorter than the character at offset: take the whole
+            # character (at most 4 bytes in UTF-8), so every call moves on
+            data = os.pread(fd, 4, offset)
+            content, next_offset = _decode_chunk(data, offset, len(data) < 4)
+    finally:
+        os.close(fd)
+
+    return {
+        "content": content,
+        "offset": offset,
+        "next_offset": next_offset,
+        "size": st.st_size,
+        "eof": next_offset >= st.st_size,
+    }
+
+
+def _list_files(directory: str = "") -> list[str]:
+    """Blocking body of list_files (runs in a worker thread)."""
+    # Security: Prevent path traversal
+    target_dir = resolve_data_path(directory)
+
+    try:
+        st = os.stat(target_dir)
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Directory not found: {directory}")
+
+    if not stat.S_ISDIR(st.st_mode):
+        raise ValueError(f"Path is not a directory: {directory}")
+
+    # List directory contents - os.listdir hands back the names directly,
+    # without building a Path (or DirEntry) object per entry
+    return os.listdir(target_dir)
+
 
 @mcp.tool()
-def read_file(path: str) -> str:
+async def read_file(path: str) -> str:
     """
     Read content of a text file from the data directory.
 
@@ -42,30 +254,40 @@ def read_file(path: str) -> str:
         The content of the file as a string
 
     Raises:
-        ValueError: If path attempts directory traversal
+        ValueError: If path attempts directory traversal, or the file is
+            too large (use read_file_chunk)
         FileNotFoundError: If file doesn't exist
     """
-    # Resolve the full path
-    requested_path = (DATA_DIR / path).resolve()
+    # File I/O blocks, and FastMCP runs tools on its event loop: a slow
+    # disk would stall every other request. The work runs in a worker
+    # thread while the loop keeps serving.
+    # (Not in the docstring - that is the tool description the LLM reads.)
+    async with _read_slots:
+        return await run_in_threadpool(_read_file, path)
 
-    # Security: Prevent path traversal attacks
-    if not requested_path.is_relative_to(DATA_DIR):
-        raise ValueError("Access denied: Path traversal attempt")
 
-    # Check file exists
-    if not requested_path.exists():
-        raise FileNotFoundError(f"File not found: {path}")
+@mcp.tool()
+async def read_file_chunk(path: str, offset: int = 0, length: int = MAX_CHUNK_BYTES) -> dict:
+    """
+    Read part of a text file from the data directory.
 
-    # Check it's actually a file
-    if not requested_path.is_file():
-        raise ValueError(f"Path is not a file: {path}")
+    Use this for files too large for read_file: start at offset 0, then
+    call again with next_offset until eof is true.
 
-    # Read and return content
-    return requested_path.read_text(encoding="utf-8")
+    Args:
+        path: Relative path to file (e.g., 'notes.txt', 'subdir/file.txt')
+        offset: Byte position to start reading from
+        length: Number of bytes to read (at most 65536)
+
+    Returns:
+        content, offset, next_offset, size (of the whole file) and eof
+    """
+    async with _read_slots:
+        return await run_in_threadpool(_read_file_chunk, path, offset, length)
 
 
 @mcp.tool()
-def list_files(directory: str = "") -> list[str]:
+async def list_files(directory: str = "") -> list[str]:
     """
     List files in the data directory or a subdirectory.
 
@@ -75,23 +297,70 @@ def list_files(directory: str = "") -> list[str]:
     Returns:
         List of file and directory names in the specified directory
     """
-    target_dir = (DATA_DIR / directory).resolve()
+    return await run_in_threadpool(_list_files, directory)
 
-    # Security: Prevent path traversal
-    if not target_dir.is_relative_to(DATA_DIR):
-        raise ValueError("Access denied: Path traversal attempt")
 
-    if not target_dir.exists():
-        raise FileNotFoundError(f"Directory not found: {directory}")
+class _SlotFileResponse(FileResponse):
+    """A FileResponse that hands its read slot back once it has been sent."""
 
-    if not target_dir.is_dir():
-        raise ValueError(f"Path is not a directory: {directory}")
+    async def __call__(self, scope, receive, send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            _read_slots.release()
+
+
+@mcp.custom_route("/raw/{path:path}", methods=["GET"])
+async def raw_file(request: Request) -> Response:
+    """
+    Serve a file from the data directory as-is, over plain HTTP.
+
+    Learning Point:
+        A tool result has to be built in memory as one JSON-RPC message.
+        A plain HTTP route can stream the file in chunks instead, so size
+        doesn't matter - handy for clients that are not an LLM (curl, a
+        browser, a script). Same path checks, and the same limit on reads
+        in progress, as the tools.
+    """
+    path = request.path_params["path"]
+
+    # The file is streamed after this handler returns, so the slot is
+    # released by the response itself when it is done (or fails)
+    await _read_slots.acquire()
+    try:
+        requested_path, st = await run_in_threadpool(stat_data_file, path)
+    except FileNotFoundError as e:
+        _read_slots.release()
+        return PlainTextResponse(str(e), status_code=404)
+    except ValueError as e:
+        _read_slots.release()
+        return PlainTextResponse(str(e), status_code=400)
+    except BaseException:
+        _read_slots.release()
+        raise
+
+    # Content type from the extension, like any static file server. Text
+    # files are served as UTF-8, the encoding the tools read them with
+    media_type = mimetypes.guess_type(requested_path)[0] or "application/octet-stream"
+    if media_type.startswith("text/"):
+        media_type += "; charset=utf-8"
 
-    # List directory contents
-    return [item.name for item in target_dir.iterdir()]
+    # The stat result is handed over, so FileResponse doesn't stat again
+    return _SlotFileResponse(requested_path, media_type=media_type, stat_result=st)
 
 
 if __name__ == "__main__":
     print("Starting MCP File Server on port 3333...")
     # Run with HTTP transport - clean API!
-    mcp.run(transport="http", host="0.0.0.0", port=3333)
+    # uvicorn uses uvloop and httptools when installed (see requirements.txt).
+    # One worker process on purpose: MCP sessions live in this process's memory
+    mcp.run(
+        transport="http",
+        host="0.0.0.0",
+        port=3333,
+        # File contents compress well (often 5-10x). Replies are sent as
+        # plain JSON rather than an SSE stream, which gzip can't compress;
+        # these tools never stream progress, so nothing is lost
+        json_response=True,
+        middleware=[Middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)],
+    )
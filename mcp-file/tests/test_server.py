@@ -0,0 +1,150 @@
+"""
+Unit tests for the file server's helpers.
+
+The tests point the server at a temporary directory instead of /data.
+
+Run from the mcp-file directory:
+    python -m unittest discover -s tests
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import server  # noqa: E402
+
+
+class DataDirTestCase(unittest.TestCase):
+    """Runs each test against a fresh temporary data directory."""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = os.path.realpath(tmp.name)
+        for name, value in (("_DATA_ROOT", self.root),
+                            ("_DATA_PREFIX", os.path.join(self.root, ""))):
+            patcher = mock.patch.object(server, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        server._missing_files.clear()
+        server._content_cache.clear()
+
+    def write(self, name, data):
+        with open(os.path.join(self.root, name), "wb") as f:
+            f.write(data)
+
+
+class ReadFileChunkTest(DataDirTestCase):
+
+    def read_all(self, name, length):
+        """Read a file chunk by chunk, like a client following next_offset."""
+        parts, offset = [], 0
+        for _ in range(100):
+            chunk = server._read_file_chunk(name, offset, length)
+            self.assertGreater(chunk["next_offset"], offset)
+            parts.append(chunk["content"])
+            if chunk["eof"]:
+                return "".join(parts)
+            offset = chunk["next_offset"]
+        self.fail("read_file_chunk made no progress")
+
+    def test_chunks_join_to_the_whole_file(self):
+        self.write("notes.txt", b"0123456789" * 10)
+        self.assertEqual(self.read_all("notes.txt", 7), "0123456789" * 10)
+
+    def test_chunk_never_splits_a_character(self):
+        text = "héllo € \U0001f600 wörld"
+        self.write("utf8.txt", text.encode("utf-8"))
+        for length in range(1, 8):
+            with self.subTest(length=length):
+                self.assertEqual(self.read_all("utf8.txt", length), text)
+
+    def test_length_shorter_than_the_character_still_moves_on(self):
+        self.write("hello.txt", "héllo".encode("utf-8"))
+        chunk = server._read_file_chunk("hello.txt", offset=1, length=1)
+        # The whole "é" (2 bytes) and what else fits in the 4 bytes read
+        self.assertEqual(chunk["content"], "éll")
+        self.assertEqual(chunk["next_offset"], 5)
+        self.assertFalse(chunk["eof"])
+
+    def test_invalid_bytes_are_replaced(self):
+        self.write("bad.bin", b"a\xffb")
+        self.assertEqual(self.read_all("bad.bin", 1), "a�b")
+
+    def test_bad_arguments(self):
+        self.write("notes.txt", b"x")
+        with self.assertRaises(ValueError):
+            server._read_file_chunk("notes.txt", offset=-1)
+        with self.assertRaises(ValueError):
+            server._read_file_chunk("notes.txt", length=0)
+
+
+
+class ResolveDataPathTest(DataDirTestCase):
+
+    def test_paths_inside_are_resolved(self):
+        self.write("notes.txt", b"x")
+        self.assertEqual(server.resolve_data_path("notes.txt"),
+                         os.path.join(self.root, "notes.txt"))
+
+    def test_traversal_is_refused(self):
+        for path in ("../etc/passwd", "a/../../x", "..\\x", "bad\0name", "/etc/passwd"):
+            with self.subTest(path=path):
+                with self.assertRaises(ValueError):
+                    server.resolve_data_path(path)
+
+    def test_repointed_symlink_is_checked_again(self):
+        self.write("target.txt", b"x")
+        link = os.path.join(self.root, "link.txt")
+        os.symlink(os.path.join(self.root, "target.txt"), link)
+        server.resolve_data_path("link.txt")
+
+        os.remove(link)
+        os.symlink("/etc/hostname", link)
+        with self.assertRaises(ValueError):
+            server.resolve_data_path("link.txt")
+
+
+
+class RawFileTest(DataDirTestCase):
+
+    def setUp(self):
+        super().setUp()
+        from starlette.testclient import TestClient
+        self.http = TestClient(server.mcp.http_app())
+
+    def test_serves_the_file_with_its_content_type(self):
+        self.write("hello.txt", "héllo".encode("utf-8"))
+        self.write("logo.png", b"\x89PNG")
+        self.write("blob", b"\x00\x01")
+
+        response = self.http.get("/raw/hello.txt")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, "héllo".encode("utf-8"))
+        self.assertEqual(response.headers["content-type"], "text/plain; charset=utf-8")
+        self.assertEqual(self.http.get("/raw/logo.png").headers["content-type"], "image/png")
+        self.assertEqual(self.http.get("/raw/blob").headers["content-type"],
+                         "application/octet-stream")
+
+    def test_errors(self):
+        os.mkdir(os.path.join(self.root, "subdir"))
+        self.assertEqual(self.http.get("/raw/missing.txt").status_code, 404)
+        self.assertEqual(self.http.get("/raw/subdir").status_code, 400)
+        # Sent as-is: an HTTP client would normalize a literal "/../"
+        response = self.http.get("/raw/subdir/%2E%2E/%2E%2E/etc/passwd")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("Path traversal", response.text)
+
+    def test_read_slots_are_given_back(self):
+        self.write("hello.txt", b"hello")
+        for path in ("hello.txt", "missing.txt", "a/%2E%2E/%2E%2E/x"):
+            self.http.get(f"/raw/{path}")
+        self.assertEqual(server._read_slots._value, server.MAX_CONCURRENT_READS)
+
+
+if __name__ == "__main__":
+    unittest.main()
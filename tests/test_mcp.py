@@ -13,9 +13,11 @@ Key Changes from Custom HTTP Tests:
 
 import asyncio
 import json
+import socket
 import time
 import sys
 import os
+from urllib.parse import urlparse
 
 from mcp import ClientSession
 from mcp.client.streamable_http import streamablehttp_client
@@ -92,6 +94,28 @@ async def test_server_async(name: str, base_url: str):
         sys.exit(1)
 
 
+def wait_ready(url: str, timeout: float = 30.0) -> bool:
+    """
+    Wait until the server at url accepts TCP connections.
+
+    Polls quickly at first, then backs off: servers that are already up
+    cost almost nothing, slow starts still get the full timeout.
+    """
+    parsed = urlparse(url)
+    address = (parsed.hostname, parsed.port or 80)
+    deadline = time.monotonic() + timeout
+    delay = 0.1
+    while True:
+        try:
+            socket.create_connection(address, timeout=0.5).close()
+            return True
+        except OSError:
+            if time.monotonic() + delay > deadline:
+                return False
+            time.sleep(delay)
+            delay = min(delay * 1.5, 1.0)
+
+
 def test_server(name: str, url: str):
     """
     Synchronous wrapper for test_server_async.
@@ -102,12 +126,14 @@ def test_server(name: str, url: str):
 def main():
     print("MCP Server Integration Tests (using official SDK)")
     print("=" * 50)
-    print("Waiting for servers to be ready...")
-    time.sleep(3)  # Give servers time to start
-
     args = sys.argv[1:]
     run_all = not args
 
+    print("Waiting for servers to be ready...")
+    for name, url in [("file", MCP_FILE_URL), ("db", MCP_DB_URL)]:
+        if (run_all or name in args) and not wait_ready(url):
+            print(f"Warning: {url} is not accepting connections yet")
+
     if run_all or "file" in args:
         test_server("MCP File", MCP_FILE_URL)
         print("\nMCP File Server: PASSED")